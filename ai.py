@@ -0,0 +1,100 @@
+#Alpha-beta move search over CheckersBoard. The board's own primitives do
+#all the work: get_legal_moves already puts forced jumps first, execute_move
+#applies a validated move, and pack_state gives a hashable position key for
+#the transposition table. The module only duck-types the board, so it has no
+#import back into the server.
+
+#Piece codes, mirrored from the server
+BLACK = 1
+WHITE = 2
+
+MAN_VALUE = 100
+KING_VALUE = 160
+#Large enough to dominate any material score; losing sooner is worse, so
+#depth is folded in to prefer the longest resistance / fastest win
+WIN_SCORE = 1_000_000
+
+#Transposition table: pack_state key -> (depth, flag, score)
+EXACT, LOWER, UPPER = 0, 1, 2
+_tt = {}
+_TT_LIMIT = 1 << 18
+
+def evaluate(board):
+    """Material balance from the side to move's perspective"""
+    score = (MAN_VALUE * (board.bm.bit_count() - board.wm.bit_count())
+             + KING_VALUE * (board.bk.bit_count() - board.wk.bit_count()))
+    return score if board.current_player == BLACK else -score
+
+def _save(board):
+    return board.bm, board.wm, board.bk, board.wk, board.current_player
+
+def _restore(board, state):
+    board.bm, board.wm, board.bk, board.wk, board.current_player = state
+
+def _ordered(moves):
+    """Biggest captures first; quiet moves keep their generation order"""
+    if moves and moves[0][2]:
+        return sorted(moves, key=lambda m: len(m[2]), reverse=True)
+    return moves
+
+def negamax(board, depth, alpha, beta):
+    """Negamax with alpha-beta pruning and a transposition table.
+    Returns the score of the position for the side to move."""
+    key = board.pack_state()
+    entry = _tt.get(key)
+    if entry is not None and entry[0] >= depth:
+        _, flag, score = entry
+        if flag == EXACT:
+            return score
+        if flag == LOWER and score >= beta:
+            return score
+        if flag == UPPER and score <= alpha:
+            return score
+
+    moves = board.get_legal_moves()
+    if not moves:
+        #Side to move has no moves and loses; prefer losing later
+        return -WIN_SCORE - depth
+    if depth == 0:
+        return evaluate(board)
+
+    alpha_orig = alpha
+    best = -WIN_SCORE * 2
+    for move in _ordered(moves):
+        state = _save(board)
+        board.execute_move(move)
+        score = -negamax(board, depth - 1, -beta, -alpha)
+        _restore(board, state)
+        if score > best:
+            best = score
+        if best > alpha:
+            alpha = best
+        if alpha >= beta:
+            break
+
+    if len(_tt) >= _TT_LIMIT:
+        _tt.clear()
+    if best <= alpha_orig:
+        _tt[key] = (depth, UPPER, best)
+    elif best >= beta:
+        _tt[key] = (depth, LOWER, best)
+    else:
+        _tt[key] = (depth, EXACT, best)
+    return best
+
+def best_move(board, depth=6):
+    """Return the best legal move triple for the side to move, or None"""
+    moves = board.get_legal_moves()
+    if not moves:
+        return None
+    best = None
+    alpha = -WIN_SCORE * 2
+    for move in _ordered(moves):
+        state = _save(board)
+        board.execute_move(move)
+        score = -negamax(board, depth - 1, -WIN_SCORE * 2, -alpha)
+        _restore(board, state)
+        if score > alpha:
+            alpha = score
+            best = move
+    return best
@@ -3,58 +3,97 @@ import time
 import threading
 import sys
 import os
-import select
+import re
+
+#Set while a game is in progress; the main loop blocks on this instead of
+#polling waiting_for_game once a second
+game_started = threading.Event()
+
+BOARD_HEADER = "  A B C D E F G H"
+
+#Fixed wire commands, encoded once at import; the server frames commands
+#on newlines, so every send is terminated with one
+QUIT_CMD = b"quit\n"
+END_GAME_CMD = b"end game\n"
+NEW_GAME_CMD = b"new game\n"
+
+#One compiled alternation finds every event marker in a message in a single
+#scan; the dispatch ladder below then tests group names instead of running a
+#dozen separate substring searches over the same text
+EVENT_RE = re.compile(
+    r"(?P<full>SERVER FULL)"
+    r"|(?P<waiting>Waiting for another player)"
+    r"|(?P<started>Game started!|New game started!)"
+    r"|(?P<board>  A B C D E F G H)"
+    r"|(?P<over>Game over|wins)"
+    r"|(?P<ended>You ended the game|BLACK ended the game|WHITE ended the game)"
+    r"|(?P<quit>Opponent quit)"
+    r"|(?P<turn>Your turn)"
+)
+
+#ANSI clear-screen + cursor-home escape; on Windows a one-time os.system('')
+#enables VT processing in the console so the same escape works there
+_CLEAR_SEQ = "\x1b[2J\x1b[H"
+if os.name == 'nt':
+    os.system('')
 
 def clear_screen():
     """Clear the console screen"""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    sys.stdout.write(_CLEAR_SEQ)
+    sys.stdout.flush()
+
+#Console glyph per board character, built once at import; str.translate
+#applies it to a whole row in one C-level call
+PIECE_TRANS = str.maketrans({'.': '·', 'b': '○', 'w': '●', 'B': '♔', 'W': '♚'})
 
 def display_board(board_str):
     """Display the board nicely in the console"""
-    clear_screen()
-    
     #Display the board with color if possible
     lines = board_str.strip().split('\n')
-    
-    #Print the board with some formatting
-    print("\n===== CHECKERS BOARD =====")
-    print("  A B C D E F G H")  #Column headers
-    
+
+    #Build the whole frame (clear sequence included) in a list, encode once
+    #and emit it with a single os.write — one syscall per board, bypassing
+    #the TextIOWrapper and BufferedWriter locks
+    parts = [_CLEAR_SEQ, "\n===== CHECKERS BOARD =====\n", "  A B C D E F G H\n"]
     row_num = 8
     for i, line in enumerate(lines):
         if i == 0:  #Skip the first line that has column numbers
             continue
-        
-        #Print row number
-        print(f"{row_num} ", end="")
+
+        parts.append(f"{row_num} ")
         row_num -= 1
-        
-        #Print pieces with potential colors
-        for char in line[2:].split():  #Skip the row number and process each cell
-            if char == '.':
-                print('· ', end="")
-            elif char == 'b':
-                print('○ ', end="")  #Black piece
-            elif char == 'w':
-                print('● ', end="")  #White piece
-            elif char == 'B':
-                print('♔ ', end="")  #Black king
-            elif char == 'W':
-                print('♚ ', end="")  #White king
-            else:
-                print(char + ' ', end="")
-        print()
-    
-    print("===========================")
+
+        parts.append(line[2:].translate(PIECE_TRANS))
+        parts.append("\n")
+
+    parts.append("===========================\n")
+    #Flush anything queued in stdout's buffer first so output stays ordered
+    sys.stdout.flush()
+    os.write(1, "".join(parts).encode('utf-8'))
 
 def message_listener(client_socket):
     """Listen for and process messages from the server"""
     global waiting_for_game, client_active  #Add client_active flag
     should_exit = False  #Add a new flag to control client exit
+    recv_buf = bytearray()  #Reassembles length-prefixed frames from the stream
     while True:
         try:
-            server_message = client_socket.recv(1024).decode('utf-8')
-            if not server_message:  #Empty message, server closed connection
+            #The server prefixes every message with a 2-byte big-endian length;
+            #buffer stream data until one complete frame is available so a
+            #message is never split or merged by TCP segmentation
+            server_message = None
+            while server_message is None:
+                if len(recv_buf) >= 2:
+                    frame_len = 2 + int.from_bytes(recv_buf[:2], 'big')
+                    if len(recv_buf) >= frame_len:
+                        server_message = recv_buf[2:frame_len].decode('utf-8')
+                        del recv_buf[:frame_len]
+                        break
+                chunk = client_socket.recv(65536)
+                if not chunk:  #Server closed connection
+                    break
+                recv_buf += chunk
+            if server_message is None:
                 print("\nServer closed connection.")
                 client_active = False  #Set client inactive
                 try:
@@ -63,84 +102,84 @@ def message_listener(client_socket):
                     pass
                 break
             
+            events = {m.lastgroup for m in EVENT_RE.finditer(server_message)}
+
             #Check if server rejected the connection
-            if "SERVER FULL" in server_message:
+            if "full" in events:
                 print(server_message)
                 client_active = False  #Set client inactive
                 return False  #Return False to indicate rejection
             
             #Print the message first (including player assignment)
             print(server_message)
-            if "Waiting for another player" in server_message:
+            if "waiting" in events:
                 waiting_for_game = True
+                game_started.clear()
                 print("Waiting for another player to join...")
-            elif "Game started!" in server_message or "New game started!" in server_message:
+            elif "started" in events:
                 waiting_for_game = False
+                game_started.set()
                 print("Game is starting!")
             #Check for board display
-            elif "  A B C D E F G H" in server_message:
-                #Extract and display the board between row markers
-                lines = server_message.split('\n')
-                board_start = -1
-                board_end = -1
-                for i, line in enumerate(lines):
-                    if "  A B C D E F G H" in line:
-                        board_start = i
-                    if board_start >= 0 and i > board_start and line.strip() == "":
-                        board_end = i
-                        break
-                if board_start >= 0:
-                    if board_end < 0:
-                        board_end = len(lines)
-                    board_str = '\n'.join(lines[board_start:board_end])
-                    display_board(board_str)
+            elif "board" in events:
+                #Extract the board with two C-level finds: the header starts
+                #it and the first blank line (or end of message) ends it
+                board_start = server_message.find(BOARD_HEADER)
+                board_end = server_message.find("\n\n", board_start)
+                if board_end == -1:
+                    board_end = len(server_message)
+                display_board(server_message[board_start:board_end])
             
             #Check for game events
-            elif "Game over" in server_message or "wins" in server_message:
+            elif "over" in events:
                 print("Game has ended.")
                 response = input("Play again? (yes/no): ").strip().lower()
                 if response == "yes":
                     print("Requesting new game...")
-                    client_socket.sendall("new game".encode('utf-8'))
+                    client_socket.sendall(NEW_GAME_CMD)
                     waiting_for_game = True
+                    game_started.clear()
                     print("Waiting for server to restart game...")
                 else:
                     print("Thanks for playing!")
-                    client_socket.sendall("quit".encode('utf-8'))
+                    client_socket.sendall(QUIT_CMD)
                     should_exit = True
                     client_active = False  #Set client inactive
                     break
             
             #Handle game ending by a player
-            elif "You ended the game" in server_message or "BLACK ended the game" in server_message or "WHITE ended the game" in server_message:
+            elif "ended" in events:
                 print("Game was ended.")
                 response = input("Play another game? (yes/no): ").strip().lower()
                 if response == "yes":
                     print("Requesting new game...")
-                    client_socket.sendall("new game".encode('utf-8'))
+                    client_socket.sendall(NEW_GAME_CMD)
                     waiting_for_game = True
+                    game_started.clear()
                     print("Waiting for server to restart game...")
                 else:
                     print("Thanks for playing!")
-                    client_socket.sendall("quit".encode('utf-8'))
+                    client_socket.sendall(QUIT_CMD)
                     should_exit = True
                     client_active = False  #Set client inactive
                     break
-            elif "Opponent quit" in server_message:
+            elif "quit" in events:
                 print("Opponent quit. Game over.")
                 response = input("Wait for another player? (yes/no): ").strip().lower()
                 if response == "yes":
                     print("Waiting for another player to connect...")
                     waiting_for_game = True
+                    game_started.clear()
                 else:
-                    client_socket.sendall("quit".encode('utf-8'))
+                    client_socket.sendall(QUIT_CMD)
                     print("You quit the game.")
                     should_exit = True
                     client_active = False  #Set client inactive
                     break
             
-            elif "Your turn" in server_message:
+            elif "turn" in events:
                 waiting_for_game = False  #Reset waiting flag
+                game_started.set()
                 print("\nIt's your turn to move!")
         
         except ConnectionResetError:
@@ -181,6 +220,9 @@ def start_client(host='127.0.0.1', port=65244):
     
     try:
         client_socket.connect((host, port))
+        #Commands are single small writes; disable Nagle so each one goes out
+        #immediately instead of waiting on the previous segment's ACK
+        client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
         print(f"Connecting to server at {host}:{port}")
                 
         #Start a thread to listen for server messages
@@ -195,11 +237,11 @@ def start_client(host='127.0.0.1', port=65244):
         email = get_email_preference()
         if email:
             print(f"Email preference set to: {email}")
-            client_socket.sendall(f"EMAIL:{email}".encode('utf-8'))
-            time.sleep(0.5)  #Give server time to process
+            #Single pre-joined write; with TCP_NODELAY it leaves in one
+            #segment and the server handles it asynchronously, so no sleep
+            client_socket.sendall(b"EMAIL:" + email.encode('utf-8') + b"\n")
         #Main input loop
         should_exit = False
-        status_message_timer = 0
 
         while not should_exit and client_active:  #Check client_active flag
             try:
@@ -213,37 +255,33 @@ def start_client(host='127.0.0.1', port=65244):
                         break
                         
                     if move.lower() == "quit":
-                        client_socket.sendall("quit".encode('utf-8'))
+                        client_socket.sendall(QUIT_CMD)
                         print("You quit the game.")
                         break
                     elif move.lower() == "end game":
-                        client_socket.sendall("end game".encode('utf-8'))
+                        client_socket.sendall(END_GAME_CMD)
                         print("Ending the game...")
-                        time.sleep(1)  #Wait for server response
                     else:
-                        #Send the move to the server
-                        client_socket.sendall(move.encode('utf-8'))
-                        
-                        #Wait a bit for the server to process
-                        time.sleep(0.5)
+                        #Send the move to the server; the listener thread
+                        #prints the reply whenever it arrives, so there is no
+                        #need to sleep here
+                        client_socket.sendall(move.encode('utf-8') + b"\n")
                 else:
                     #Don't wait forever if server connection is lost
                     if not client_active:
                         print("\nConnection to server lost while waiting for game.")
                         break
-                        
-                    time.sleep(1)  #Check every second, but don't print anything
-                    
-                    #Print status message every 10 seconds, but only if connection is active
-                    current_time = int(time.time())
-                    if current_time % 10 == 0 and current_time != status_message_timer:
-                        status_message_timer = current_time
+
+                    #Block until the listener signals the game is on; wake at
+                    #most every 10 seconds for a status line instead of
+                    #polling once a second
+                    if not game_started.wait(timeout=10):
                         print("Still waiting for game to start... (press Ctrl+C to quit)")
                                     
             except KeyboardInterrupt:
                 print("\nKeyboard interrupt received. Exiting...")
                 try:
-                    client_socket.sendall("quit".encode('utf-8'))
+                    client_socket.sendall(QUIT_CMD)
                 except:
                     pass
                 break
@@ -8,16 +8,24 @@ import traceback
 import socket
 import os
 import re
+import mmap
+import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import requests
 
-from dnslib import DNSLabel, QTYPE, RR, dns
+from dnslib import DNSLabel, DNSHeader, QTYPE, RR, dns
 from dnslib.server import DNSServer, DNSHandler, BaseResolver, DNSLogger
 from dnslib.dns import DNSRecord
 
 # Default upstream DNS server
 UPSTREAM_DNS = "8.8.8.8"
 
+#Matches one "IP domain" hosts-file line; compiled once and run over the
+#whole downloaded body with findall instead of splitting and re-parsing
+#the text line by line in Python
+HOSTS_LINE_RE = re.compile(rb'^[ \t]*(?:\d{1,3}\.){3}\d{1,3}[ \t]+([^\s#]+)', re.MULTILINE)
+
 # Blocklist sources
 BLOCKLIST_SOURCES = [
     "https://raw.githubusercontent.com/StevenBlack/hosts/master/hosts",
@@ -32,14 +40,57 @@ class BlocklistResolver(BaseResolver):
         self.upstream_dns = upstream_dns
         self.blocklist_path = blocklist_path
         self.allowlist_path = allowlist_path
-        self.blocklist = set()
-        self.allowlist = set()
+        self.blocklist = frozenset()
+        self.allowlist = frozenset()
+        self._blockset_labels = frozenset()
+        self._allowset_labels = frozenset()
+        self._trie = {}
         self.load_blocklist()
         if allowlist_path:
             self.load_allowlist()
         self.blocked_count = 0
         self.total_count = 0
         self.start_time = time.time()
+        #Blocked-domain log entries are queued and written in batches by a
+        #daemon thread so the resolver never blocks on stdout
+        self._log_q = queue.SimpleQueue()
+        threading.Thread(target=self._log_worker, daemon=True).start()
+        #Upstream answers cached per (domain, qtype) until their TTL runs
+        #out, so repeat queries are answered without a round trip upstream
+        self._answer_cache = {}
+        self._cache_lock = threading.Lock()
+        #Shared rdata for every blocked answer; only the qname differs
+        #between blocked replies
+        self._blocked_rdata = dns.A("0.0.0.0")
+        #Each resolver thread keeps one connected UDP socket to the upstream
+        #server instead of letting dnslib open and close one per query
+        self._upstream_local = threading.local()
+
+    def _upstream_udp(self):
+        """Connected upstream UDP socket, one per resolver thread"""
+        sock = getattr(self._upstream_local, 'sock', None)
+        if sock is None:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.connect((self.upstream_dns, 53))
+            sock.settimeout(5)
+            self._upstream_local.sock = sock
+        return sock
+
+    def _log_worker(self):
+        """Drain queued log entries and write them in batches"""
+        while True:
+            entries = [self._log_q.get()]
+            deadline = time.time() + 0.1
+            while len(entries) < 256:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    entries.append(self._log_q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            sys.stdout.write("".join(f"Blocked: {domain}\n" for domain in entries))
+            sys.stdout.flush()
 
     def load_blocklist(self):
         """Load blocklist from file"""
@@ -47,22 +98,56 @@ class BlocklistResolver(BaseResolver):
             if not os.path.exists(self.blocklist_path):
                 print(f"Blocklist file not found: {self.blocklist_path}")
                 return
+            if os.path.getsize(self.blocklist_path) == 0:
+                #mmap cannot map an empty file
+                return
                 
-            with open(self.blocklist_path, 'r', encoding='utf-8', errors='ignore') as f:
-                for line in f:
-                    # Skip comments and empty lines
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        # Handle hosts file format (IP domain)
-                        parts = line.split()
-                        if len(parts) >= 2:
-                            domain = parts[1].lower()
-                            # Skip localhost entries
-                            if domain not in ('localhost', 'localhost.localdomain', 'local'):
-                                self.blocklist.add(domain)
+            #mmap the file and run the same hosts-line regex used by the
+            #download path over the raw bytes: one C-level scan, no text
+            #decode of the file and no per-line str allocation
+            with open(self.blocklist_path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                self.blocklist = frozenset(
+                    domain
+                    for raw in HOSTS_LINE_RE.findall(mm)
+                    #Skip localhost entries
+                    if (domain := raw.decode('utf-8', errors='ignore').lower())
+                    not in ('localhost', 'localhost.localdomain', 'local')
+                )
+            #Exact-match fast path keyed by the raw label tuples dnslib
+            #hands us in the query, so a hit never builds a str
+            self._blockset_labels = frozenset(
+                tuple(d.encode('utf-8').split(b'.')) for d in self.blocklist
+            )
+            self._trie = self._build_trie(self.blocklist)
             print(f"Loaded {len(self.blocklist)} domains into blocklist")
         except Exception as e:
             print(f"Error loading blocklist: {e}")
+
+    @staticmethod
+    def _build_trie(domains):
+        """Build a reversed-label trie from the blocklist"""
+        #Nested dicts keyed by raw label bytes, walked TLD-first; a None key
+        #marks a terminal node, which blocks that domain and everything
+        #under it
+        trie = {}
+        for domain in domains:
+            node = trie
+            for label in reversed(domain.encode('utf-8').split(b'.')):
+                node = node.setdefault(label, {})
+            node[None] = None
+        return trie
+
+    def _is_blocked(self, labels):
+        """Walk the trie TLD-first; O(labels) with early exit on a miss"""
+        node = self._trie
+        for label in reversed(labels):
+            node = node.get(label)
+            if node is None:
+                return False
+            if None in node:
+                return True
+        return False
     
     def load_allowlist(self):
         """Load allowlist from file"""
@@ -72,49 +157,95 @@ class BlocklistResolver(BaseResolver):
                 return
                 
             with open(self.allowlist_path, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        self.allowlist.add(line.lower())
+                self.allowlist = frozenset(
+                    stripped.lower()
+                    for line in f
+                    if (stripped := line.strip()) and not stripped.startswith('#')
+                )
+            self._allowset_labels = frozenset(
+                tuple(d.encode('utf-8').split(b'.')) for d in self.allowlist
+            )
             print(f"Loaded {len(self.allowlist)} domains into allowlist")
         except Exception as e:
             print(f"Error loading allowlist: {e}")
             
     def resolve(self, request, handler):
         """Resolve a DNS request, first checking against blocklist"""
-        domain = str(request.q.qname)
         self.total_count += 1
-        
-        # Remove trailing dot from domain
-        if domain.endswith('.'):
-            domain = domain[:-1]
-        
-        domain = domain.lower()
-            
+
+        #Hot path stays on the raw qname bytes dnslib already parsed: one
+        #bytes.lower per label, no str build on the (majority) miss path.
+        #A readable str is only made for the block log
+        labels = tuple(label.lower() for label in request.q.qname.label)
+
         # Check if domain is in allowlist
-        if self.allowlist and domain in self.allowlist:
+        if self.allowlist and labels in self._allowset_labels:
             # Allow this domain even if it's in blocklist
             pass
-        # Check if domain is in blocklist
-        elif domain in self.blocklist:
+        # Check if domain (or a parent of it) is in the blocklist
+        elif labels in self._blockset_labels or self._is_blocked(labels):
             self.blocked_count += 1
-            print(f"Blocked: {domain}")
+            self._log_q.put_nowait(b'.'.join(labels).decode('utf-8', errors='ignore'))
+            
+            # Create a response with 0.0.0.0 for blocked domains; build the
+            # record directly instead of going through request.reply()'s
+            # header-copying path, reusing one shared rdata object
+            return DNSRecord(
+                DNSHeader(id=request.header.id, qr=1, aa=1, ra=1),
+                q=request.q,
+                a=RR(request.q.qname, QTYPE.A, rdata=self._blocked_rdata, ttl=60),
+            )
             
-            # Create a response with 0.0.0.0 for blocked domains
+        # If not blocked, answer from the cache when a live entry exists
+        cache_key = (labels, request.q.qtype)
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._answer_cache.get(cache_key)
+        if cached is not None and cached[0] > now:
             reply = request.reply()
-            reply.add_answer(RR(request.q.qname, QTYPE.A, rdata=dns.A("0.0.0.0"), ttl=60))
+            for rr in cached[1]:
+                reply.add_answer(rr)
             return reply
-            
-        # If not blocked, forward to upstream DNS
+
+        # Cache miss or expired entry: forward to upstream DNS
         try:
             if handler.protocol == 'udp':
-                proxy_r = request.send(self.upstream_dns, 53)
+                sock = self._upstream_udp()
+                sock.send(request.pack())
+                #The socket is reused, so a late reply to an earlier query
+                #may arrive first; match on the transaction id
+                while True:
+                    reply = DNSRecord.parse(sock.recv(4096))
+                    if reply.header.id == request.header.id:
+                        break
             else:
                 proxy_r = request.send(self.upstream_dns, 53, tcp=True)
-            reply = DNSRecord.parse(proxy_r)
+                reply = DNSRecord.parse(proxy_r)
+            if reply.rr:
+                #Honour the shortest TTL in the answer, clamped to a sane
+                #range so a 0-TTL record still gets brief reuse and a huge
+                #one cannot go stale for hours
+                ttl = min(rr.ttl for rr in reply.rr)
+                ttl = min(max(ttl, 30), 3600)
+                with self._cache_lock:
+                    if len(self._answer_cache) >= 4096:
+                        #Drop dead entries before growing past the cap
+                        self._answer_cache = {
+                            key: entry for key, entry in self._answer_cache.items()
+                            if entry[0] > now
+                        }
+                    self._answer_cache[cache_key] = (now + ttl, reply.rr)
             return reply
         except Exception as e:
             print(f"Error forwarding: {e}")
+            #Drop this thread's upstream socket so the next query reconnects
+            sock = getattr(self._upstream_local, 'sock', None)
+            if sock is not None:
+                try:
+                    sock.close()
+                except Exception:
+                    pass
+                self._upstream_local.sock = None
             return request.reply()
     
     def get_stats(self):
@@ -135,34 +266,48 @@ def download_blocklists(sources, output_path):
     try:
         print(f"Downloading blocklists from {len(sources)} sources...")
         combined_domains = set()
+
+        # One Session shared by every worker: connections (and TLS
+        # handshakes) are pooled and reused when sources share a host,
+        # instead of each request paying its own setup
+        session = requests.Session()
+
+        def fetch(url):
+            print(f"Downloading from {url}...")
+            response = session.get(url, timeout=30)
+            response.raise_for_status()
+            return response.content
+
+        # The downloads are independent and network-bound, so fetch them all
+        # concurrently and merge each body as it finishes
+        with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+            futures = {pool.submit(fetch, url): url for url in sources}
+            for future in as_completed(futures):
+                try:
+                    body = future.result()
+                except Exception as e:
+                    print(f"Error downloading from {futures[future]}: {e}")
+                    continue
+                # Process the downloaded list: one findall over the raw bytes
+                # extracts every hosts entry in a single C-level scan; the
+                # domains stay bytes all the way to the output file
+                for raw_domain in HOSTS_LINE_RE.findall(body):
+                    domain = raw_domain.lower()
+                    # Skip localhost entries
+                    if domain not in (b'localhost', b'localhost.localdomain', b'local'):
+                        combined_domains.add(domain)
         
-        for url in sources:
-            try:
-                print(f"Downloading from {url}...")
-                response = requests.get(url, timeout=30)
-                response.raise_for_status()
-                
-                # Process the downloaded list
-                for line in response.text.splitlines():
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        parts = line.split()
-                        if len(parts) >= 2 and re.match(r'^(\d{1,3}\.){3}\d{1,3}$', parts[0]):
-                            domain = parts[1].lower()
-                            # Skip localhost entries
-                            if domain not in ('localhost', 'localhost.localdomain', 'local'):
-                                combined_domains.add(domain)
-            except Exception as e:
-                print(f"Error downloading from {url}: {e}")
-        
-        # Write combined list to file
-        with open(output_path, 'w') as f:
-            f.write(f"# Combined blocklist - Updated {datetime.datetime.now()}\n")
-            f.write(f"# Sources: {', '.join(sources)}\n")
-            f.write(f"# Total domains: {len(combined_domains)}\n\n")
-            
-            for domain in sorted(combined_domains):
-                f.write(f"0.0.0.0 {domain}\n")
+        # Write combined list to file: join everything into one bytes blob
+        # and emit it with a single write instead of one call per domain
+        header = (
+            f"# Combined blocklist - Updated {datetime.datetime.now()}\n"
+            f"# Sources: {', '.join(sources)}\n"
+            f"# Total domains: {len(combined_domains)}\n\n"
+        ).encode('utf-8')
+        with open(output_path, 'wb') as f:
+            f.write(header)
+            if combined_domains:
+                f.write(b"0.0.0.0 " + b"\n0.0.0.0 ".join(sorted(combined_domains)) + b"\n")
                 
         print(f"Blocklist downloaded with {len(combined_domains)} domains to {output_path}")
     except Exception as e:
@@ -6,6 +6,7 @@ from email.mime.text import MIMEText
 from email.mime.application import MIMEApplication
 import datetime
 import threading
+import queue
 
 class EmailHandler:
     def __init__(self, smtp_server="smtp.gmail.com", smtp_port=587):
@@ -20,9 +21,54 @@ class EmailHandler:
             "WHITE": None
         }
         
-        # Game history for summary
-        self.game_history = []
+        # Game history for summary, stored column-wise: parallel lists per
+        # field instead of a dict per move, plus only the latest board since
+        # the summary never shows earlier ones
+        self._ts = []
+        self._players = []
+        self._from = []
+        self._to = []
+        self._last_board = None
         self.game_start_time = None
+
+        # One SMTP connection reused across games; guarded by a lock since
+        # sends run on background threads
+        self._smtp = None
+        self._smtp_lock = threading.Lock()
+
+        # Send jobs go through one bounded queue drained by a single worker,
+        # so rapid game restarts queue up instead of racing fresh threads
+        # over the SMTP connection
+        self._jobs = queue.Queue(maxsize=8)
+        threading.Thread(target=self._email_worker, daemon=True).start()
+
+    def _email_worker(self):
+        """Process queued summary sends serially"""
+        while True:
+            summary, filename = self._jobs.get()
+            try:
+                self._send_emails(summary, filename)
+            finally:
+                self._jobs.task_done()
+
+    def _get_smtp(self):
+        """Return a live SMTP connection, reconnecting if the old one died"""
+        if self._smtp is not None:
+            try:
+                self._smtp.noop()
+                return self._smtp
+            except Exception:
+                try:
+                    self._smtp.close()
+                except Exception:
+                    pass
+                self._smtp = None
+
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+        server.starttls()
+        server.login(self.sender_email, self.sender_password)
+        self._smtp = server
+        return server
         
     def set_player_email(self, player_color, email):
         """Set email address for a player"""
@@ -37,24 +83,24 @@ class EmailHandler:
     
     def reset_game(self):
         """Reset game history when starting a new game"""
-        self.game_history = []
+        self._ts = []
+        self._players = []
+        self._from = []
+        self._to = []
+        self._last_board = None
         self.game_start_time = datetime.datetime.now()
     
     def add_move(self, player_color, from_pos, to_pos, board_state):
         """Add a move to the game history"""
-        timestamp = datetime.datetime.now()
-        move_entry = {
-            "timestamp": timestamp,
-            "player": player_color,
-            "from": from_pos,
-            "to": to_pos,
-            "board": board_state
-        }
-        self.game_history.append(move_entry)
+        self._ts.append(datetime.datetime.now())
+        self._players.append(player_color)
+        self._from.append(from_pos)
+        self._to.append(to_pos)
+        self._last_board = board_state
     
     def generate_game_summary(self, end_reason="Game completed", winner=None):
         """Generate a text summary of the game"""
-        if not self.game_history:
+        if not self._players:
             return "No game data available."
         
         summary = "CHECKERS GAME SUMMARY\n"
@@ -72,15 +118,17 @@ class EmailHandler:
         # Game moves
         summary += "MOVES:\n"
         summary += "------\n"
-        for i, move in enumerate(self.game_history, 1):
-            time_str = move["timestamp"].strftime('%H:%M:%S')
-            summary += f"{i}. {move['player']} moved from {move['from']} to {move['to']} ({time_str})\n"
+        summary += "".join(
+            f"{i}. {player} moved from {from_pos} to {to_pos} ({ts:%H:%M:%S})\n"
+            for i, (player, from_pos, to_pos, ts)
+            in enumerate(zip(self._players, self._from, self._to, self._ts), 1)
+        )
         
         summary += "\n"
         summary += "FINAL BOARD STATE:\n"
         summary += "----------------\n"
-        if self.game_history:
-            summary += self.game_history[-1]["board"]
+        if self._last_board is not None:
+            summary += self._last_board
         
         return summary
     
@@ -103,12 +151,12 @@ class EmailHandler:
         summary = self.generate_game_summary(end_reason, winner)
         filename = self.save_summary_to_file(summary)
         
-        # Send emails in background thread to avoid blocking
-        threading.Thread(
-            target=self._send_emails,
-            args=(summary, filename),
-            daemon=True
-        ).start()
+        # Hand the send to the background worker so the caller never blocks
+        try:
+            self._jobs.put_nowait((summary, filename))
+        except queue.Full:
+            print("Email queue full; dropping this summary send.")
+            return False
         
         return True
     
@@ -122,32 +170,31 @@ class EmailHandler:
             return
         
         try:
-            # Connect to server
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
-                
-                # Send to each recipient separately
-                for recipient in recipients:
-                    # Create a new message for each recipient
-                    message = MIMEMultipart()
-                    message["From"] = self.sender_email
-                    message["To"] = recipient
-                    message["Subject"] = "Your Checkers Game Summary"
-                    
-                    # Attach the body
-                    body = "Thank you for playing Checkers! Please find attached the summary of your game."
-                    message.attach(MIMEText(body, "plain"))
-                    
-                    # Attach the file
-                    with open(filename, "rb") as file:
-                        attachment = MIMEApplication(file.read(), Name=filename)
-                    attachment["Content-Disposition"] = f'attachment; filename="{filename}"'
-                    message.attach(attachment)
-                    
-                    # Send email
-                    server.sendmail(self.sender_email, recipient, message.as_string())
-                    print(f"Email sent to {recipient}")
+            # Build one message for everyone: the attachment is read and
+            # base64-encoded once instead of once per recipient
+            message = MIMEMultipart()
+            message["From"] = self.sender_email
+            message["To"] = ", ".join(recipients)
+            message["Subject"] = "Your Checkers Game Summary"
+            
+            # Attach the body
+            body = "Thank you for playing Checkers! Please find attached the summary of your game."
+            message.attach(MIMEText(body, "plain"))
+            
+            # Attach the file
+            with open(filename, "rb") as file:
+                attachment = MIMEApplication(file.read(), Name=filename)
+            attachment["Content-Disposition"] = f'attachment; filename="{filename}"'
+            message.attach(attachment)
+            
+            # Reuse the pooled connection instead of paying a fresh TCP +
+            # STARTTLS + login handshake every game, and deliver to every
+            # recipient in a single transaction
+            with self._smtp_lock:
+                server = self._get_smtp()
+                server.send_message(message, from_addr=self.sender_email, to_addrs=recipients)
+            for recipient in recipients:
+                print(f"Email sent to {recipient}")
             
             print("All emails sent successfully!")
             
@@ -6,16 +6,22 @@ import time
 import threading
 import traceback
 import socket
+import selectors
+import struct
 import os
 import re
 import random
+import itertools
+from enum import IntEnum
 from pathlib import Path
 import requests
 import subprocess
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, Future
 
 #Add email bridge import
 import server_bridge
+#Alpha-beta search for the AI move button
+import ai
 
 #Set up email credentials at startup
 print("Setting up email functionality...")
@@ -29,6 +35,7 @@ import numpy as np
 import gradio as gr
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib.collections import PatchCollection
 import queue
 
 #Game Constants
@@ -37,6 +44,14 @@ BLACK = 1
 WHITE = 2
 BLACK_KING = 3
 WHITE_KING = 4
+#Wire/display name per side; indexing this replaces the repeated
+#"BLACK" if player == BLACK else "WHITE" conditional
+COLOR_NAME = {BLACK: "BLACK", WHITE: "WHITE"}
+
+class GameState(IntEnum):
+    WAITING = 0
+    PLAYING = 1
+    OVER = 2
 
 #Ad Blocker Constants
 UPSTREAM_DNS = "8.8.8.8"
@@ -75,33 +90,85 @@ AD_DOMAINS_TO_CHECK = [
     "gradio.app"
 ]
 
+#The status panel cycles through the demo domains; lowercase them once
+#so check_domain_status never re-lowercases on the refresh path, and
+#shuffle so the rotation start still varies run to run
+_ad_domain_cycle = itertools.cycle(
+    sorted((d.lower() for d in AD_DOMAINS_TO_CHECK), key=lambda _: random.random()))
+
 #Global variables
-clients = []
-client_names = []
-game_state = "waiting"  #"waiting", "playing", "over"
-message_queues = {}  #For client communication
+clients = {}  #Connected sockets keyed by role: "BLACK" / "WHITE"
+game_state = GameState.WAITING
 board = None
-current_turn = BLACK  #Track whose turn it is
 game_ender = None  #Track who ended the game
-ad_blocker_status = "Ad blocker not initialized"
-current_domain = random.choice(AD_DOMAINS_TO_CHECK)  #Track current displayed domain
+current_domain = next(_ad_domain_cycle)  #Track current displayed domain
 current_domain_status = "Not checked yet"
 new_game_requests = [False, False]  #Track which players requested a new game (BLACK, WHITE)
 client_states = [{"active": False, "waiting": False}, {"active": False, "waiting": False}]  #Track client state
 
+#One reentrant lock guards the shared game state above; client threads and
+#the Gradio UI thread both mutate it. Reentrant so helpers that already
+#hold it can call each other freely
+STATE_LOCK = threading.RLock()
+
+#Version counter bumped whenever shared state the UI shows has changed;
+#the refresh timer compares it to the last rendered version and skips the
+#expensive matplotlib redraw on idle ticks
+state_version = 0
+
+def mark_state_dirty():
+    """Record a state transition so the next UI refresh re-renders"""
+    global state_version
+    with STATE_LOCK:
+        state_version += 1
+
+#One compiled pass pulls the domain out of every "IP domain" hosts line;
+#anchored per line, so comments and malformed entries are skipped for free
+HOSTS_LINE_RE = re.compile(rb'^[ \t]*(?:\d{1,3}\.){3}\d{1,3}[ \t]+([^\s#]+)', re.MULTILINE)
+
 class BlocklistResolver(BaseResolver):
     def __init__(self, upstream_dns, blocklist_path, allowlist_path=None):
         self.upstream_dns = upstream_dns
         self.blocklist_path = blocklist_path
         self.allowlist_path = allowlist_path
-        self.blocklist = set()
-        self.allowlist = set()
+        self.blocklist = frozenset()
+        self.allowlist = frozenset()
+        self._trie = {}
+        #Lazy reload bookkeeping: list-file mtimes as of the last load and
+        #the earliest time we bother stat-ing them again
+        self._list_mtimes = (None, None)
+        self._next_reload_check = 0.0
         self.load_blocklist()
         if allowlist_path:
             self.load_allowlist()
+        self._list_mtimes = self._current_mtimes()
         self.blocked_count = 0
         self.total_count = 0
         self.start_time = time.time()
+        #Upstream answers cached by (domain, qtype) until their TTL runs
+        #out; repeated queries for hot names never leave the process
+        self._answer_cache = {}
+        self._cache_lock = threading.Lock()
+        #In-flight upstream queries by cache key, so concurrent duplicates
+        #share one round trip instead of all going upstream
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        #Shared rdata for every blocked reply
+        self._blocked_rdata = dns.A("0.0.0.0")
+        #One connected UDP socket to the upstream server per resolver
+        #thread; dnslib's request.send would build and tear down a fresh
+        #socket for every forwarded query
+        self._upstream_local = threading.local()
+
+    def _upstream_udp(self):
+        """Connected upstream UDP socket, one per resolver thread"""
+        sock = getattr(self._upstream_local, 'sock', None)
+        if sock is None:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.connect((self.upstream_dns, 12553))
+            sock.settimeout(5)
+            self._upstream_local.sock = sock
+        return sock
 
     def load_blocklist(self):
         """Load blocklist from file"""
@@ -110,21 +177,95 @@ class BlocklistResolver(BaseResolver):
                 print(f"Blocklist file not found: {self.blocklist_path}")
                 return
                 
-            with open(self.blocklist_path, 'r', encoding='utf-8', errors='ignore') as f:
-                for line in f:
-                    #Skip comments and empty lines
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        #Handle hosts file format (IP domain)
-                        parts = line.split()
-                        if len(parts) >= 2:
-                            domain = parts[1].lower()
-                            #Skip localhost entries
-                            if domain not in ('localhost', 'localhost.localdomain', 'local'):
-                                self.blocklist.add(domain)
+            #Read the whole file once and let the compiled regex extract
+            #every hosts-format domain in a single C-level pass instead of
+            #stripping and splitting line by line in Python
+            with open(self.blocklist_path, 'rb') as f:
+                raw = f.read().lower()
+            domains = set()
+            for raw_domain in HOSTS_LINE_RE.findall(raw):
+                domain = raw_domain.decode('utf-8', errors='ignore')
+                #Skip localhost entries
+                if domain not in ('localhost', 'localhost.localdomain', 'local'):
+                    domains.add(domain)
+            #Frozen after loading: lookups hit a read-only table and no code
+            #path can mutate the list mid-query
+            self.blocklist = frozenset(domains)
+            self._trie = self._build_trie(self.blocklist)
             print(f"Loaded {len(self.blocklist)} domains into blocklist")
         except Exception as e:
             print(f"Error loading blocklist: {e}")
+
+    def _warm_cache(self):
+        """Resolve the allowlisted names once so their first real query is
+        served from the answer cache instead of a cold upstream round trip.
+        Best effort: any failure just leaves that name cold."""
+        for domain in self.allowlist:
+            try:
+                request = DNSRecord.question(domain)
+                sock = self._upstream_udp()
+                sock.send(request.pack())
+                while True:
+                    reply = DNSRecord.parse(sock.recv(4096))
+                    if reply.header.id == request.header.id:
+                        break
+                if reply.rr:
+                    ttl = min(rr.ttl for rr in reply.rr)
+                    ttl = min(max(ttl, 30), 3600)
+                    with self._cache_lock:
+                        self._answer_cache[(domain, QTYPE.A)] = (time.monotonic() + ttl, reply.rr)
+            except Exception:
+                continue
+
+    def _current_mtimes(self):
+        """mtimes of the blocklist and allowlist files (None if absent)"""
+        mtimes = []
+        for file_path in (self.blocklist_path, self.allowlist_path):
+            try:
+                mtimes.append(os.stat(file_path).st_mtime if file_path else None)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def _maybe_reload(self):
+        """Re-read the list files when they changed on disk, checking their
+        mtimes at most once every 30 seconds so the hot path normally pays
+        only a clock read and a compare"""
+        now = time.monotonic()
+        if now < self._next_reload_check:
+            return
+        self._next_reload_check = now + 30
+        mtimes = self._current_mtimes()
+        if mtimes != self._list_mtimes:
+            print("Blocklist files changed on disk, reloading...")
+            self.load_blocklist()
+            if self.allowlist_path:
+                self.load_allowlist()
+            self._list_mtimes = mtimes
+
+    @staticmethod
+    def _build_trie(domains):
+        """Build a reversed-label trie from the blocklist"""
+        #Nested dicts keyed by label, walked TLD-first; a None key marks a
+        #terminal node, which blocks that domain and everything under it
+        trie = {}
+        for domain in domains:
+            node = trie
+            for label in reversed(domain.split('.')):
+                node = node.setdefault(label, {})
+            node[None] = None
+        return trie
+
+    def _is_blocked(self, domain):
+        """Walk the trie TLD-first; O(labels) with early exit on a miss"""
+        node = self._trie
+        for label in reversed(domain.split('.')):
+            node = node.get(label)
+            if node is None:
+                return False
+            if None in node:
+                return True
+        return False
     
     def load_allowlist(self):
         """Load allowlist from file"""
@@ -134,16 +275,19 @@ class BlocklistResolver(BaseResolver):
                 return
                 
             with open(self.allowlist_path, 'r') as f:
+                domains = set()
                 for line in f:
                     line = line.strip()
                     if line and not line.startswith('#'):
-                        self.allowlist.add(line.lower())
+                        domains.add(line.lower())
+            self.allowlist = frozenset(domains)
             print(f"Loaded {len(self.allowlist)} domains into allowlist")
         except Exception as e:
             print(f"Error loading allowlist: {e}")
             
     def resolve(self, request, handler):
         """Resolve a DNS request, first checking against blocklist"""
+        self._maybe_reload()
         domain = str(request.q.qname)
         self.total_count += 1
         
@@ -157,26 +301,89 @@ class BlocklistResolver(BaseResolver):
         if self.allowlist and domain in self.allowlist:
             #Allow this domain even if it's in blocklist
             pass
-        #Check if domain is in blocklist
-        elif domain in self.blocklist:
+        #Check if domain (or a parent of it) is in the blocklist
+        elif self._is_blocked(domain):
             self.blocked_count += 1
             print(f"Blocked: {domain}")
             
             #Create a response with 0.0.0.0 for blocked domains
             reply = request.reply()
-            reply.add_answer(RR(request.q.qname, QTYPE.A, rdata=dns.A("0.0.0.0"), ttl=60))
+            reply.add_answer(RR(request.q.qname, QTYPE.A, rdata=self._blocked_rdata, ttl=60))
             return reply
-            
+
+        #Serve repeats from the answer cache while their TTL lasts; the
+        #monotonic clock cannot jump backwards and extend an entry's life
+        cache_key = (domain, request.q.qtype)
+        now = time.monotonic()
+        with self._cache_lock:
+            entry = self._answer_cache.get(cache_key)
+        if entry is not None and entry[0] > now:
+            reply = request.reply()
+            for rr in entry[1]:
+                reply.add_answer(rr)
+            return reply
+
         #If not blocked, forward to upstream DNS
         try:
             if handler.protocol == 'udp':
-                proxy_r = request.send(self.upstream_dns, 12553)
+                #Merge concurrent duplicates: the first thread asking for a
+                #name does the round trip and the rest wait for its records,
+                #then answer under their own transaction ids
+                with self._inflight_lock:
+                    fut = self._inflight.get(cache_key)
+                    is_leader = fut is None
+                    if is_leader:
+                        fut = Future()
+                        self._inflight[cache_key] = fut
+                if not is_leader:
+                    reply = request.reply()
+                    for rr in fut.result(timeout=5):
+                        reply.add_answer(rr)
+                    return reply
+                try:
+                    sock = self._upstream_udp()
+                    sock.send(request.pack())
+                    #The socket is reused, so a late reply to an earlier query
+                    #may arrive first; match on the transaction id
+                    while True:
+                        reply = DNSRecord.parse(sock.recv(4096))
+                        if reply.header.id == request.header.id:
+                            break
+                    fut.set_result(reply.rr)
+                except Exception as e:
+                    fut.set_exception(e)
+                    raise
+                finally:
+                    with self._inflight_lock:
+                        self._inflight.pop(cache_key, None)
             else:
                 proxy_r = request.send(self.upstream_dns, 12553, tcp=True)
-            reply = DNSRecord.parse(proxy_r)
+                reply = DNSRecord.parse(proxy_r)
+            if reply.rr:
+                #Honour the shortest TTL in the answer, clamped so a 0-TTL
+                #record still gets brief reuse and a huge one cannot go
+                #stale for hours
+                ttl = min(rr.ttl for rr in reply.rr)
+                ttl = min(max(ttl, 30), 3600)
+                with self._cache_lock:
+                    if len(self._answer_cache) >= 4096:
+                        #Drop dead entries before growing past the cap
+                        self._answer_cache = {
+                            key: cached for key, cached in self._answer_cache.items()
+                            if cached[0] > now
+                        }
+                    self._answer_cache[cache_key] = (now + ttl, reply.rr)
             return reply
         except Exception as e:
             print(f"Error forwarding: {e}")
+            #Drop this thread's upstream socket so the next query reconnects
+            sock = getattr(self._upstream_local, 'sock', None)
+            if sock is not None:
+                try:
+                    sock.close()
+                except Exception:
+                    pass
+                self._upstream_local.sock = None
             return request.reply()
     
     def get_stats(self):
@@ -192,112 +399,413 @@ class BlocklistResolver(BaseResolver):
             "uptime": f"{int(hours)}h {int(minutes)}m {int(seconds)}s"
         }
 
+#DNS wire header: id, flags, qdcount, ancount, nscount, arcount
+_DNS_HDR = struct.Struct(">HHHHHH")
+#Static tail of a blocked answer: name pointer to the question (0xc00c),
+#type A, class IN, TTL 60, rdlength 4, rdata 0.0.0.0
+_BLOCKED_TAIL = b"\xc0\x0c\x00\x01\x00\x01\x00\x00\x00\x3c\x00\x04\x00\x00\x00\x00"
+
+class _UDPHandlerShim:
+    """Stands in for dnslib's handler; the resolver only reads .protocol"""
+    protocol = 'udp'
+
+class WorkerPoolDNSServer:
+    """UDP DNS front end: a receiver thread feeding a worker pool.
+
+    dnslib's DNSServer services one request at a time on its server
+    thread, so a single slow upstream lookup stalls every query queued
+    behind it. Here the receiver does nothing but pull datagrams off the
+    socket and hand them to a bounded ThreadPoolExecutor; workers parse,
+    resolve and reply directly. sendto is atomic per UDP datagram, so the
+    workers can share the socket without a dedicated sender thread."""
+
+    def __init__(self, resolver, address="127.0.0.1", port=12553, workers=None):
+        self.resolver = resolver
+        self.address = address
+        self.port = port
+        #Enough workers to absorb blocking upstream waits without
+        #thrashing; the work itself is I/O-bound
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        self.sock = None
+        self._handler = _UDPHandlerShim()
+
+    def _blocked_fast_path(self, packet):
+        """Answer a blocked plain A query straight from the raw packet.
+        For the most common case -- one A/IN question for a blocked name --
+        this skips dnslib's full parse and response build; anything else
+        returns None and takes the regular resolver path."""
+        if len(packet) < 17:
+            return None
+        tid, flags, qd, an, auth, ar = _DNS_HDR.unpack_from(packet)
+        #Plain queries only: QR=0, opcode 0, one question, nothing else
+        if flags & 0xF800 or qd != 1 or an or auth or ar:
+            return None
+        labels = []
+        pos = 12
+        try:
+            while True:
+                label_len = packet[pos]
+                if label_len == 0:
+                    pos += 1
+                    break
+                if label_len & 0xC0:  #No compression in a lone question
+                    return None
+                labels.append(packet[pos + 1:pos + 1 + label_len])
+                pos += 1 + label_len
+            qtype, qclass = struct.unpack_from(">HH", packet, pos)
+        except (IndexError, struct.error):
+            return None
+        if qtype != 1 or qclass != 1:
+            return None
+        resolver = self.resolver
+        resolver._maybe_reload()
+        domain = b".".join(labels).lower().decode('utf-8', 'ignore')
+        if resolver.allowlist and domain in resolver.allowlist:
+            return None
+        if not resolver._is_blocked(domain):
+            return None
+        resolver.total_count += 1
+        resolver.blocked_count += 1
+        print(f"Blocked: {domain}")
+        #Echo the question and flip the header into an authoritative
+        #one-answer response, keeping the client's RD bit
+        reply_flags = 0x8480 | (flags & 0x0100)
+        return (_DNS_HDR.pack(tid, reply_flags, 1, 1, 0, 0)
+                + packet[12:pos + 4] + _BLOCKED_TAIL)
+
+    def _handle(self, packet, addr):
+        try:
+            data = self._blocked_fast_path(packet)
+            if data is not None:
+                self.sock.sendto(data, addr)
+                return
+            request = DNSRecord.parse(packet)
+            reply = self.resolver.resolve(request, self._handler)
+            data = reply.pack()
+            if len(data) > 512:
+                #Oversized UDP replies are truncated like dnslib does;
+                #the client retries over TCP
+                data = reply.truncate().pack()
+            self.sock.sendto(data, addr)
+        except Exception as e:
+            print(f"Error handling DNS query: {e}")
+
+    def start(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((self.address, self.port))
+        print(f"DNS server listening on {self.address}:{self.port}")
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="dns")
+        while True:
+            try:
+                packet, addr = self.sock.recvfrom(4096)
+            except OSError:
+                break
+            pool.submit(self._handle, packet, addr)
+
+#Bitboard geometry: only the 32 dark squares are playable, indexed row-major
+#(sq = row * 4 + col // 2). The board is four 32-bit ints, one bit per dark
+#square, so move generation is a few shifts/ANDs instead of a 64-cell scan.
+DARK_SQUARES = [(r, c) for r in range(8) for c in range(8) if (r + c) % 2 == 1]
+SQ_TO_RC = DARK_SQUARES
+RC_TO_SQ = {rc: sq for sq, rc in enumerate(DARK_SQUARES)}
+ALL32 = 0xFFFFFFFF
+#Even rows hold dark squares on odd columns, odd rows on even columns; the
+#diagonal shift amount (3/4/5) depends on which kind of row a bit sits in.
+EVEN_ROWS = sum(1 << sq for sq, (r, c) in enumerate(DARK_SQUARES) if r % 2 == 0)
+ODD_ROWS = ALL32 ^ EVEN_ROWS
+#Edge files: squares that would wrap around the board if shifted left/right.
+FILE_L = sum(1 << sq for sq, (r, c) in enumerate(DARK_SQUARES) if c == 0)
+FILE_R = sum(1 << sq for sq, (r, c) in enumerate(DARK_SQUARES) if c == 7)
+
+def shift_up_left(bb):
+    return (((bb & EVEN_ROWS) >> 4) | (((bb & ODD_ROWS) & ~FILE_L) >> 5)) & ALL32
+
+def shift_up_right(bb):
+    return ((((bb & EVEN_ROWS) & ~FILE_R) >> 3) | ((bb & ODD_ROWS) >> 4)) & ALL32
+
+def shift_down_left(bb):
+    return (((bb & EVEN_ROWS) << 4) | (((bb & ODD_ROWS) & ~FILE_L) << 3)) & ALL32
+
+def shift_down_right(bb):
+    return ((((bb & EVEN_ROWS) & ~FILE_R) << 5) | ((bb & ODD_ROWS) << 4)) & ALL32
+
+def bits_to_positions(bb):
+    """Expand a bitboard into a list of (row, col) positions"""
+    positions = []
+    while bb:
+        lsb = bb & -bb
+        bb ^= lsb
+        positions.append(SQ_TO_RC[lsb.bit_length() - 1])
+    return positions
+
+#Map the (dr, dc) direction convention onto the bitboard shifts
+DIRECTION_SHIFTS = {
+    (-1, -1): shift_up_left,
+    (-1, 1): shift_up_right,
+    (1, -1): shift_down_left,
+    (1, 1): shift_down_right,
+}
+
+def _build_move_tables():
+    """Precompute, per piece type and per square, the reachable step bits and
+    (capture bit, landing bit) jump pairs. Built once at import so move
+    generation is straight table lookups with no boundary math at runtime."""
+    up = [(-1, -1), (-1, 1)]
+    down = [(1, -1), (1, 1)]
+    piece_dirs = {BLACK: up, WHITE: down,
+                  BLACK_KING: up + down, WHITE_KING: up + down}
+    move_table, jump_table = {}, {}
+    for piece, dirs in piece_dirs.items():
+        piece_moves, piece_jumps = [], []
+        for sq in range(32):
+            bit = 1 << sq
+            steps, jumps = [], []
+            for direction in dirs:
+                shift = DIRECTION_SHIFTS[direction]
+                step = shift(bit)
+                if step:
+                    steps.append(step)
+                    land = shift(step)
+                    if land:
+                        jumps.append((step, land))
+            piece_moves.append(tuple(steps))
+            piece_jumps.append(tuple(jumps))
+        move_table[piece] = tuple(piece_moves)
+        jump_table[piece] = tuple(piece_jumps)
+    return move_table, jump_table
+
+MOVE_TABLE, JUMP_TABLE = _build_move_tables()
+
+#Board rendering constants: two-character glyph per piece code
+BOARD_HEADER = "  A B C D E F G H"
+PIECE_GLYPHS = (". ", "b ", "w ", "B ", "W ")
+
+#Move directions per piece code; kings go both ways. Move generation itself
+#uses the precomputed bitboard tables — this only backs get_move_directions
+_DIRS = {
+    EMPTY: (),
+    BLACK: ((-1, -1), (-1, 1)),
+    WHITE: ((1, -1), (1, 1)),
+    BLACK_KING: ((-1, -1), (-1, 1), (1, -1), (1, 1)),
+    WHITE_KING: ((-1, -1), (-1, 1), (1, -1), (1, 1)),
+}
+
 class CheckersBoard:
+    #Fixed attribute set: drops the per-instance __dict__, which matters for
+    #the throwaway boards the search layer and GUI fallbacks create
+    __slots__ = ("bm", "wm", "bk", "wk", "current_player", "_move_memo")
+
     def __init__(self):
-        self.board = np.zeros((8, 8), dtype=int)
+        #Four bitboards: black men, white men, black kings, white kings
+        self.bm = 0
+        self.wm = 0
+        self.bk = 0
+        self.wk = 0
         self.current_player = BLACK
+        #Legal moves memoized per position, keyed by the packed state, so
+        #the repeated calls from make_move, is_game_over and the GUI on the
+        #same position cost one dict lookup; a new position simply keys a
+        #new entry, so nothing is invalidated on a move
+        self._move_memo = {}
         self.setup_board()
 
     def setup_board(self):
-        for row in range(8):
-            for col in range(8):
-                if (row + col) % 2 == 1:
-                    if row < 3:
-                        self.board[row][col] = WHITE
-                    elif row > 4:
-                        self.board[row][col] = BLACK
+        self.bm = sum(1 << sq for sq, (r, c) in enumerate(DARK_SQUARES) if r > 4)
+        self.wm = sum(1 << sq for sq, (r, c) in enumerate(DARK_SQUARES) if r < 3)
+        self.bk = 0
+        self.wk = 0
+
+    @property
+    def board(self):
+        """8x8 numpy view of the bitboards (for the GUI and board_to_string)"""
+        arr = np.zeros((8, 8), dtype=np.int8)
+        for sq, (r, c) in enumerate(DARK_SQUARES):
+            bit = 1 << sq
+            if self.bm & bit:
+                arr[r][c] = BLACK
+            elif self.wm & bit:
+                arr[r][c] = WHITE
+            elif self.bk & bit:
+                arr[r][c] = BLACK_KING
+            elif self.wk & bit:
+                arr[r][c] = WHITE_KING
+        return arr
 
     def is_valid_position(self, row, col):
         return 0 <= row < 8 and 0 <= col < 8
 
+    def pack_state(self):
+        """Pack the position into two uint64-sized ints: 3 bits per dark
+        square (squares 0-20 in lo, 21-31 in hi) plus the side to move.
+        12 bytes instead of a ~150-byte ASCII board; also usable as a
+        hashable position key."""
+        lo = 0
+        hi = 0
+        for val, bb in ((BLACK, self.bm), (WHITE, self.wm),
+                        (BLACK_KING, self.bk), (WHITE_KING, self.wk)):
+            while bb:
+                lsb = bb & -bb
+                bb ^= lsb
+                sq = lsb.bit_length() - 1
+                if sq < 21:
+                    lo |= val << (3 * sq)
+                else:
+                    hi |= val << (3 * (sq - 21))
+        hi |= (self.current_player - 1) << 33
+        return hi, lo
+
+    def occupied(self):
+        return self.bm | self.wm | self.bk | self.wk
+
+    def player_pieces(self, player=None):
+        if player is None:
+            player = self.current_player
+        return (self.bm | self.bk) if player == BLACK else (self.wm | self.wk)
+
+    def opponent_pieces(self, player=None):
+        if player is None:
+            player = self.current_player
+        return (self.wm | self.wk) if player == BLACK else (self.bm | self.bk)
+
     def get_piece(self, row, col):
-        if not self.is_valid_position(row, col):
+        sq = RC_TO_SQ.get((row, col))
+        if sq is None:
             return EMPTY
-        return self.board[row][col]
+        bit = 1 << sq
+        if self.bm & bit:
+            return BLACK
+        if self.wm & bit:
+            return WHITE
+        if self.bk & bit:
+            return BLACK_KING
+        if self.wk & bit:
+            return WHITE_KING
+        return EMPTY
 
     def is_player_piece(self, row, col):
-        piece = self.get_piece(row, col)
-        if self.current_player == BLACK:
-            return piece in (BLACK, BLACK_KING)
-        else:
-            return piece in (WHITE, WHITE_KING)
+        sq = RC_TO_SQ.get((row, col))
+        return sq is not None and bool(self.player_pieces() & (1 << sq))
 
     def is_opponent_piece(self, row, col):
-        piece = self.get_piece(row, col)
-        if self.current_player == BLACK:
-            return piece in (WHITE, WHITE_KING)
-        else:
-            return piece in (BLACK, BLACK_KING)
+        sq = RC_TO_SQ.get((row, col))
+        return sq is not None and bool(self.opponent_pieces() & (1 << sq))
 
     def is_king(self, row, col):
-        piece = self.get_piece(row, col)
-        return piece in (BLACK_KING, WHITE_KING)
+        sq = RC_TO_SQ.get((row, col))
+        return sq is not None and bool((self.bk | self.wk) & (1 << sq))
 
     def make_king(self, row, col):
-        piece = self.get_piece(row, col)
-        if piece == BLACK and row == 0:
-            self.board[row][col] = BLACK_KING
-        elif piece == WHITE and row == 7:
-            self.board[row][col] = WHITE_KING
+        sq = RC_TO_SQ.get((row, col))
+        if sq is None:
+            return
+        bit = 1 << sq
+        if self.bm & bit and row == 0:
+            self.bm ^= bit
+            self.bk |= bit
+        elif self.wm & bit and row == 7:
+            self.wm ^= bit
+            self.wk |= bit
 
     def get_move_directions(self, row, col):
-        piece = self.get_piece(row, col)
-        if piece in (BLACK_KING, WHITE_KING):
-            return [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-        elif piece == BLACK:
-            return [(-1, -1), (-1, 1)]
-        elif piece == WHITE:
-            return [(1, -1), (1, 1)]
-        return []
+        return _DIRS[self.get_piece(row, col)]
 
     def get_legal_moves(self):
+        key = self.pack_state()
+        cached = self._move_memo.get(key)
+        if cached is not None:
+            return cached
         moves, jumps = [], []
-        for row in range(8):
-            for col in range(8):
-                if self.is_player_piece(row, col):
-                    jumps += self.get_jumps(row, col)
-                    if not jumps:
-                        moves += self.get_moves(row, col)
-        return jumps if jumps else moves
+        pieces = self.player_pieces()
+        bb = pieces
+        while bb:
+            lsb = bb & -bb
+            bb ^= lsb
+            row, col = SQ_TO_RC[lsb.bit_length() - 1]
+            jumps += self.get_jumps(row, col)
+            if not jumps:
+                moves += self.get_moves(row, col)
+        result = jumps if jumps else moves
+        if len(self._move_memo) >= 4096:
+            self._move_memo.clear()
+        self._move_memo[key] = result
+        return result
 
     def get_moves(self, row, col):
+        sq = RC_TO_SQ.get((row, col))
+        if sq is None:
+            return []
+        piece = self.get_piece(row, col)
+        if piece == EMPTY:
+            return []
+        empty = ALL32 ^ self.occupied()
         moves = []
-        for dr, dc in self.get_move_directions(row, col):
-            r, c = row + dr, col + dc
-            if self.is_valid_position(r, c) and self.get_piece(r, c) == EMPTY:
-                moves.append(((row, col), (r, c), []))
+        for dest in MOVE_TABLE[piece][sq]:
+            if dest & empty:
+                moves.append(((row, col), SQ_TO_RC[dest.bit_length() - 1], []))
         return moves
 
-    def get_jumps(self, row, col, captured=None):
-        if captured is None:
-            captured = []
+    def get_jumps(self, row, col):
+        start_sq = RC_TO_SQ.get((row, col))
+        if start_sq is None:
+            return []
+        piece = self.get_piece(row, col)
+        if piece == EMPTY:
+            return []
+        table = JUMP_TABLE[piece]
+        opp = self.opponent_pieces()
+        empty = ALL32 ^ self.occupied()
         jumps = []
-        for dr, dc in self.get_move_directions(row, col):
-            jump_row, jump_col = row + 2 * dr, col + 2 * dc
-            cap_row, cap_col = row + dr, col + dc
-            if (self.is_valid_position(jump_row, jump_col) and
-                    self.get_piece(jump_row, jump_col) == EMPTY and
-                    self.is_opponent_piece(cap_row, cap_col) and
-                    (cap_row, cap_col) not in captured):
-                new_captured = captured + [(cap_row, cap_col)]
-                jumps.append(((row, col), (jump_row, jump_col), new_captured))
-                jumps.extend(self.get_jumps(jump_row, jump_col, new_captured))
+        #Iterative DFS; each frame is (square, mask of captured squares).
+        #The mask doubles as the "already jumped" set, so the search needs no
+        #per-branch list copies and never mutates the board.
+        stack = [(start_sq, 0)]
+        while stack:
+            sq, captured_mask = stack.pop()
+            for cap_bit, land_bit in table[sq]:
+                if cap_bit & opp and not cap_bit & captured_mask and land_bit & empty:
+                    new_mask = captured_mask | cap_bit
+                    land_sq = land_bit.bit_length() - 1
+                    jumps.append(((row, col), SQ_TO_RC[land_sq],
+                                  bits_to_positions(new_mask)))
+                    stack.append((land_sq, new_mask))
         return jumps
 
+    def find_legal_move(self, from_pos, to_pos):
+        """Return the matching legal move triple, or None if no such move"""
+        for move in self.get_legal_moves():
+            if move[0] == from_pos and move[1] == to_pos:
+                return move
+        return None
+
+    def execute_move(self, move):
+        """Apply a pre-validated move triple without re-searching legal moves"""
+        move_from, move_to, captured = move
+        from_bit = 1 << RC_TO_SQ[move_from]
+        to_bit = 1 << RC_TO_SQ[move_to]
+        if self.bm & from_bit:
+            self.bm ^= from_bit | to_bit
+        elif self.wm & from_bit:
+            self.wm ^= from_bit | to_bit
+        elif self.bk & from_bit:
+            self.bk ^= from_bit | to_bit
+        elif self.wk & from_bit:
+            self.wk ^= from_bit | to_bit
+        for cap_pos in captured:
+            cap_bit = 1 << RC_TO_SQ[cap_pos]
+            self.bm &= ~cap_bit
+            self.wm &= ~cap_bit
+            self.bk &= ~cap_bit
+            self.wk &= ~cap_bit
+        self.make_king(*move_to)
+        self.current_player = WHITE if self.current_player == BLACK else BLACK
+
     def make_move(self, from_pos, to_pos):
-        legal_moves = self.get_legal_moves()
-        for move in legal_moves:
-            move_from, move_to, captured = move
-            if move_from == from_pos and move_to == to_pos:
-                fr, fc = move_from
-                tr, tc = move_to
-                self.board[fr][fc], self.board[tr][tc] = EMPTY, self.board[fr][fc]
-                for cr, cc in captured:
-                    self.board[cr][cc] = EMPTY
-                self.make_king(tr, tc)
-                self.current_player = WHITE if self.current_player == BLACK else BLACK
-                return True
-        return False
+        move = self.find_legal_move(from_pos, to_pos)
+        if move is None:
+            return False
+        self.execute_move(move)
+        return True
 
     def is_game_over(self):
         return not self.get_legal_moves()
@@ -306,41 +814,62 @@ class CheckersBoard:
         return WHITE if self.current_player == BLACK else BLACK
 
     def board_to_string(self):
-        lines = ["  A B C D E F G H"]
+        grid = self.board
+        lines = [BOARD_HEADER]
         for i in range(8):
-            line = f"{8-i} "
-            for j in range(8):
-                piece = self.board[i][j]
-                line += {EMPTY: ".", BLACK: "b", WHITE: "w", BLACK_KING: "B", WHITE_KING: "W"}[piece] + " "
-            lines.append(line)
+            lines.append(f"{8-i} " + "".join([PIECE_GLYPHS[v] for v in grid[i]]))
         return "\n".join(lines)
 
     def coords_to_notation(self, row, col):
         return f"{chr(col + ord('A'))}{8 - row}"
 
+#Every valid square notation, upper and lower case, resolved to (row, col)
+#once at import; parsing a square becomes a single dict hit instead of
+#ord/int arithmetic per call
+_NOTATION = {f"{c}{r}": (8 - r, ord(c.upper()) - ord('A'))
+             for c in "ABCDEFGHabcdefgh" for r in range(1, 9)}
+
 def notation_to_coords(notation):
-    col = ord(notation[0].upper()) - ord('A')
-    row = 8 - int(notation[1])
-    return row, col
+    """Map 'E2' (or 'e2') to (row, col); raises KeyError on bad input"""
+    return _NOTATION[notation]
+
+#Compiled once: matching validates the whole "E2 to E4" form (column A-H,
+#row 1-8) in a single step instead of split + strip + per-char checks
+MOVE_RE = re.compile(r'^\s*([A-Ha-h][1-8])\s+to\s+([A-Ha-h][1-8])\s*$')
+
+def frame_message(text):
+    """Encode one length-prefixed message: 2-byte big-endian payload length
+    followed by the UTF-8 payload. TCP has no message boundaries, so the
+    prefix lets the client reassemble exactly one logical message per frame
+    no matter how the stream is segmented."""
+    payload = text.encode('utf-8')
+    return struct.pack("!H", len(payload)) + payload
+
+def send_framed(sock, text):
+    sock.sendall(frame_message(text))
 
 def broadcast_to_clients(message_black, message_white=None):
     """Send messages to connected clients, with customized messages per player"""
-    if message_white is None:
-        message_white = message_black  #If no specific white message, use the same for both
-        
-    #Send to BLACK player (if connected and active)
-    if len(clients) > 0 and client_states[0]["active"]:
-        try:
-            clients[0].sendall(message_black.encode('utf-8'))
-        except:
-            client_states[0]["active"] = False  #Mark as inactive if send fails
-            
-    #Send to WHITE player (if connected and active)
-    if len(clients) > 1 and client_states[1]["active"]:
+    #Frame and encode each distinct message once; when both players get
+    #the same text the identical bytes buffer is sent to both sockets
+    frame_black = frame_message(message_black)
+    frame_white = frame_black if message_white is None else frame_message(message_white)
+
+    #Snapshot the targets under the lock, then do the blocking sends
+    #outside it so socket I/O doesn't serialize the rest of the game
+    with STATE_LOCK:
+        #Every broadcast marks a state transition the UI should reflect
+        mark_state_dirty()
+        targets = []
+        if "BLACK" in clients and client_states[0]["active"]:
+            targets.append((0, clients["BLACK"], frame_black))
+        if "WHITE" in clients and client_states[1]["active"]:
+            targets.append((1, clients["WHITE"], frame_white))
+    for client_id, sock, frame in targets:
         try:
-            clients[1].sendall(message_white.encode('utf-8'))
+            sock.sendall(frame)
         except:
-            client_states[1]["active"] = False  #Mark as inactive if send fails
+            client_states[client_id]["active"] = False  #Mark as inactive if send fails
 
 def update_game_status():
     """Update the game status based on current state"""
@@ -350,22 +879,32 @@ def update_game_status():
         return "Waiting for players to connect..."
     elif len(clients) == 1:
         return "Waiting for second player..."
-    elif game_state == "over":
+    elif game_state == GameState.OVER:
         if game_ender:
             return f"Game ended by {game_ender}."
         else:
-            winner = "BLACK" if board.get_winner() == BLACK else "WHITE"
+            winner = COLOR_NAME[board.get_winner()]
             return f"Game over! {winner} wins."
     else:
-        turn = "BLACK" if board.current_player == BLACK else "WHITE"
+        turn = COLOR_NAME[board.current_player]
         return f"Game in progress. {turn}'s turn."
 
+#Last player panel rendered, keyed by who is connected; the text only
+#changes when a socket joins or leaves, so repeats return the identical
+#string object and Gradio's diffing can short-circuit
+_player_status_cache = (None, None)
+
 def get_player_status():
     """Return a formatted string of player connection status"""
+    global _player_status_cache
+    key = ("BLACK" in clients, "WHITE" in clients)
+    if _player_status_cache[0] == key:
+        return _player_status_cache[1]
     players = "BLACK: "
-    players += "Connected" if len(clients) > 0 else "Waiting"
+    players += "Connected" if key[0] else "Waiting"
     players += "\nWHITE: "
-    players += "Connected" if len(clients) > 1 else "Waiting"
+    players += "Connected" if key[1] else "Waiting"
+    _player_status_cache = (key, players)
     return players
 
 def check_domain_status(domain):
@@ -373,14 +912,15 @@ def check_domain_status(domain):
     global current_domain_status, ad_blocker
     
     try:
-        #Check directly against the blocklist
-        if domain.lower() in ad_blocker.blocklist:
+        #Check directly against the blocklist; domains from the cycle are
+        #already lowercase
+        if domain in ad_blocker.blocklist:
             #Update stats when checking domain
             ad_blocker.total_count += 1
             ad_blocker.blocked_count += 1
             current_domain_status = "🔴 Blocked"
             return f"Domain: {domain}\nStatus: 🔴 Blocked"
-        elif ad_blocker.allowlist and domain.lower() in ad_blocker.allowlist:
+        elif ad_blocker.allowlist and domain in ad_blocker.allowlist:
             #Update stats when checking domain
             ad_blocker.total_count += 1
             current_domain_status = "🟢 Allowed (Allowlisted)"
@@ -416,472 +956,602 @@ def get_ad_blocker_status():
     return status
 
 def refresh_domain():
-    """Select a new random domain to display"""
+    """Advance to the next domain in the display rotation"""
     global current_domain
-    current_domain = random.choice(AD_DOMAINS_TO_CHECK)
+    current_domain = next(_ad_domain_cycle)
+    mark_state_dirty()
     return get_ad_blocker_status()
 
 #GUI
+#The checkerboard background never changes, so the figure with its 64
+#square patches and axis setup is built once and only the piece artists
+#are torn down and redrawn per refresh. A lock serializes access since
+#both the refresh timer and move handlers draw
+_board_fig = None
+_board_ax = None
+_piece_artists = []
+#pack_state of the position currently on the figure; drawing the same
+#position again returns the figure untouched
+_last_drawn_key = None
+_draw_lock = threading.Lock()
+#Shared starting position shown before a game exists; every page load used
+#to build a fresh board just to draw the same opening squares
+_initial_board = CheckersBoard()
+
+def _build_empty_board():
+    global _board_fig, _board_ax
+    _board_fig, _board_ax = plt.subplots(figsize=(5, 5))
+    #All 64 squares go in as one collection: matplotlib validates the
+    #axes transform once instead of per add_patch
+    squares = []
+    colors = []
+    for row in range(8):
+        for col in range(8):
+            squares.append(patches.Rectangle((col, row), 1, 1))
+            colors.append("#f0d9b5" if (row + col) % 2 == 0 else "#b58863")
+    _board_ax.add_collection(PatchCollection(squares, facecolors=colors))
+    _board_ax.set_xlim(0, 8)
+    _board_ax.set_ylim(0, 8)
+    _board_ax.set_xticks(range(8))
+    _board_ax.set_yticks(range(8))
+    _board_ax.set_xticklabels(['A','B','C','D','E','F','G','H'])
+    _board_ax.set_yticklabels(['8','7','6','5','4','3','2','1'])
+    _board_ax.tick_params(left=False, bottom=False)
+    _board_ax.set_aspect('equal')
+    _board_ax.invert_yaxis()
+
 def draw_board_gui(board_obj=None):
+    global _last_drawn_key
     if board_obj is None and board is not None:
         board_obj = board
     elif board_obj is None:
-        #Create a new board if none exists
-        board_obj = CheckersBoard()
-    
-    fig, ax = plt.subplots(figsize=(5, 5))
-    for row in range(8):
-        for col in range(8):
-            color = "#f0d9b5" if (row + col) % 2 == 0 else "#b58863"
-            ax.add_patch(patches.Rectangle((col, row), 1, 1, facecolor=color))
+        #No game yet: show the shared starting position
+        board_obj = _initial_board
 
-    for row in range(8):
-        for col in range(8):
-            piece = board_obj.board[row][col]
-            if piece != EMPTY:
-                clr = "#3B1F0B" if piece in (BLACK, BLACK_KING) else "#FFF5DC"
-                ax.add_patch(plt.Circle((col + 0.5, row + 0.5), 0.35, color=clr, ec="black", linewidth=1.5))
-                #Add a crown for kings
+    with _draw_lock:
+        if _board_fig is None:
+            _build_empty_board()
+        #Board positions repeat across refreshes (status-only updates,
+        #reconnects, the same game shown to several sessions); when the
+        #position already on the canvas is requested again the artists are
+        #left alone and the cached figure is returned as-is
+        key = board_obj.pack_state()
+        if key == _last_drawn_key:
+            return _board_fig
+        _last_drawn_key = key
+        for artist in _piece_artists:
+            artist.remove()
+        _piece_artists.clear()
+
+        grid = board_obj.board  #Materialize the bitboards once for drawing
+        #Gather piece centers per color and draw each side with a single
+        #scatter call instead of one Circle patch per piece; only the king
+        #crowns remain individual text artists
+        black_xy = []
+        white_xy = []
+        kings = []
+        for row in range(8):
+            for col in range(8):
+                piece = grid[row][col]
+                if piece == EMPTY:
+                    continue
+                center = (col + 0.5, row + 0.5)
+                if piece in (BLACK, BLACK_KING):
+                    black_xy.append(center)
+                else:
+                    white_xy.append(center)
                 if piece in (BLACK_KING, WHITE_KING):
-                    ax.text(col + 0.5, row + 0.5, "♔", fontsize=16, 
-                           ha='center', va='center', 
-                           color="#B58863" if piece == BLACK_KING else "#3B1F0B")
-
-    ax.set_xlim(0, 8)
-    ax.set_ylim(0, 8)
-    ax.set_xticks(range(8))
-    ax.set_yticks(range(8))
-    ax.set_xticklabels(['A','B','C','D','E','F','G','H'])
-    ax.set_yticklabels(['8','7','6','5','4','3','2','1'])
-    ax.tick_params(left=False, bottom=False)
-    ax.set_aspect('equal')
-    plt.gca().invert_yaxis()
-    return fig
+                    kings.append((center, "#B58863" if piece == BLACK_KING else "#3B1F0B"))
+        for coords, clr in ((black_xy, "#3B1F0B"), (white_xy, "#FFF5DC")):
+            if coords:
+                xs, ys = zip(*coords)
+                _piece_artists.append(_board_ax.scatter(
+                    xs, ys, s=900, c=clr, edgecolors="black", linewidths=1.5, zorder=2))
+        for (x, y), clr in kings:
+            _piece_artists.append(_board_ax.text(
+                x, y, "♔", fontsize=16, ha='center', va='center', color=clr))
+        return _board_fig
 
-def move_piece_gui(start, end):
+def _ui_outputs(status):
+    """Build the four outputs every handler returns in one place: board
+    figure, status line, player panel, ad-blocker panel"""
+    return draw_board_gui(board), status, get_player_status(), get_ad_blocker_status()
+
+def _apply_move(start, end, player_color=None):
+    """Validate and play one move for the side to move. The caller holds
+    STATE_LOCK. player_color restricts the move to that side (network
+    path); None lets whichever side is to move play (GUI path). Returns
+    (ok, status): an error text on failure, a result line on success.
+    Broadcasts, move recording and game-over handling all happen here so
+    the GUI and socket paths cannot drift apart."""
     global board, game_state
-    
-    if game_state != "playing":
-        return draw_board_gui(board), "Game not in active play state. Cannot make move.", get_player_status(), get_ad_blocker_status()
-    
+
+    mover = COLOR_NAME[board.current_player]
+    if player_color is not None and mover != player_color:
+        return False, "Not your turn!"
+
     try:
         sr, sc = notation_to_coords(start.strip())
         er, ec = notation_to_coords(end.strip())
-        
-        #Validate that the correct player is moving
-        piece = board.get_piece(sr, sc)
-        is_black_piece = piece in (BLACK, BLACK_KING)
-        is_white_piece = piece in (WHITE, WHITE_KING)
-        
-        if (is_black_piece and board.current_player != BLACK) or (is_white_piece and board.current_player != WHITE):
-            return draw_board_gui(board), "Not your turn!", get_player_status(), get_ad_blocker_status()
-        
-        if not board.make_move((sr, sc), (er, ec)):
-            return draw_board_gui(board), "Invalid move.", get_player_status(), get_ad_blocker_status()
-        
-        #Update board status
-        board_str = board.board_to_string()
-        move_msg = f"\nMove made: {start} to {end}\n{board_str}\n"
-        #Record move for email summary
-        player_color = "BLACK" if board.current_player == WHITE else "WHITE"  #Player who just moved
-        server_bridge.record_move(player_color, start, end, board_str)
-        
-        if board.is_game_over():
-            game_state = "over"
-            winner = "BLACK" if board.get_winner() == BLACK else "WHITE"
-            
-            #Send different messages to each player
-            black_msg = f"\nGame over! {'You win!' if winner == 'BLACK' else 'WHITE wins.'}\n{board_str}\n"
-            white_msg = f"\nGame over! {'You win!' if winner == 'WHITE' else 'BLACK wins.'}\n{board_str}\n"
-            broadcast_to_clients(black_msg, white_msg)
+    except KeyError:
+        return False, "Invalid move. Try again."
 
-            #Generate and send game summary by email
-            server_bridge.on_game_end("Game completed", winner)
-            
-            return draw_board_gui(board), f"Game over! {winner} wins.", get_player_status(), get_ad_blocker_status()
-        else:
-            next_player = "BLACK" if board.current_player == BLACK else "WHITE"
-            
-            #Send different messages to each player
-            if next_player == "BLACK":
-                black_msg = f"{move_msg}\nYour turn, BLACK\n"
-                white_msg = f"{move_msg}\nBLACK is playing now\n"
-            else:
-                black_msg = f"{move_msg}\nWHITE is playing now\n"
-                white_msg = f"{move_msg}\nYour turn, WHITE\n"
-                
-            broadcast_to_clients(black_msg, white_msg)
-            
-            
-            return draw_board_gui(board), f"Move made: {start} to {end}. {next_player}'s turn now.", get_player_status(), get_ad_blocker_status()
-            
-    except Exception as e:
-        return draw_board_gui(board), f"Error: {str(e)}", get_player_status(), get_ad_blocker_status()
+    #Normalize for messages so 'e2' renders as 'E2'
+    start = board.coords_to_notation(sr, sc)
+    end = board.coords_to_notation(er, ec)
+
+    #Moving the opponent's piece reads better as a turn error than as an
+    #illegal move
+    piece = board.get_piece(sr, sc)
+    if piece != EMPTY and COLOR_NAME[BLACK if piece in (BLACK, BLACK_KING) else WHITE] != mover:
+        return False, "Not your turn!"
+
+    if not board.make_move((sr, sc), (er, ec)):
+        return False, "Invalid move. Try again."
+
+    #Rendered once per applied move and reused in every message
+    board_str = board.board_to_string()
+    server_bridge.record_move(mover, start, end, board_str)
+
+    if board.is_game_over():
+        game_state = GameState.OVER
+        winner = COLOR_NAME[board.get_winner()]
+        black_msg = f"\nGame over! {'You win!' if winner == 'BLACK' else 'WHITE wins.'}\n{board_str}\n"
+        white_msg = f"\nGame over! {'You win!' if winner == 'WHITE' else 'BLACK wins.'}\n{board_str}\n"
+        broadcast_to_clients(black_msg, white_msg)
+        server_bridge.on_game_end("Game completed", winner)
+        return True, f"Game over! {winner} wins."
+
+    move_msg = f"\nMove made: {start} to {end}\n{board_str}\n"
+    next_player = COLOR_NAME[board.current_player]
+    if next_player == "BLACK":
+        broadcast_to_clients(f"{move_msg}\nYour turn, BLACK\n", f"{move_msg}\nBLACK is playing now\n")
+    else:
+        broadcast_to_clients(f"{move_msg}\nWHITE is playing now\n", f"{move_msg}\nYour turn, WHITE\n")
+    return True, f"Move made: {start} to {end}. {next_player}'s turn now."
+
+def move_piece_gui(start, end):
+    global board, game_state
+    
+    with STATE_LOCK:
+        if game_state != GameState.PLAYING:
+            return _ui_outputs("Game not in active play state. Cannot make move.")
+    
+        try:
+            ok, status = _apply_move(start, end)
+        except Exception as e:
+            status = f"Error: {str(e)}"
+        return _ui_outputs(status)
 
 def restart_game():
     """Restart the game by creating a new board and updating all clients"""
     global board, game_state, game_ender
     
-    if len(clients) < 2:
-        return draw_board_gui(board), "Need 2 players to restart game", get_player_status(), get_ad_blocker_status()
+    with STATE_LOCK:
+        if len(clients) < 2:
+            return _ui_outputs("Need 2 players to restart game")
     
-    board = CheckersBoard()
-    game_state = "playing"
-    game_ender = None  #Reset game ender
+        board = CheckersBoard()
+        game_state = GameState.PLAYING
+        game_ender = None  #Reset game ender
 
-    #Reset game history for email summary
-    server_bridge.on_game_start()
+        #Reset game history for email summary
+        server_bridge.on_game_start()
     
-    board_str = board.board_to_string()
+        board_str = board.board_to_string()
     
-    #Send different messages to each player
-    black_msg = f"\nGame restarted!\n{board_str}\n\nYour turn, BLACK\n"
-    white_msg = f"\nGame restarted!\n{board_str}\n\nBLACK's turn first\n"
-    broadcast_to_clients(black_msg, white_msg)
+        #Send different messages to each player
+        black_msg = f"\nGame restarted!\n{board_str}\n\nYour turn, BLACK\n"
+        white_msg = f"\nGame restarted!\n{board_str}\n\nBLACK's turn first\n"
+        broadcast_to_clients(black_msg, white_msg)
     
-    return draw_board_gui(board), "Game restarted! BLACK's turn first.", get_player_status(), get_ad_blocker_status()
+        return _ui_outputs("Game restarted! BLACK's turn first.")
 
 def end_game(player=None):
     """End the current game and notify all clients"""
     global board, game_state, game_ender
     
-    if game_state != "playing":
-        return draw_board_gui(board), "No active game to end.", get_player_status(), get_ad_blocker_status()
+    with STATE_LOCK:
+        if game_state != GameState.PLAYING:
+            return _ui_outputs("No active game to end.")
     
-    game_state = "over"
+        game_state = GameState.OVER
     
-    #Set who ended the game
-    if player:
-        game_ender = player
-    else:
-        current_player = "BLACK" if board.current_player == BLACK else "WHITE"
-        game_ender = current_player
+        #Set who ended the game
+        if player:
+            game_ender = player
+        else:
+            current_player = COLOR_NAME[board.current_player]
+            game_ender = current_player
     
-    #Send different messages to each player
-    if game_ender == "BLACK":
-        black_msg = "\nYou ended the game.\n"
-        white_msg = "\nBLACK ended the game.\n"
-    else:  #WHITE
-        black_msg = "\nWHITE ended the game.\n"
-        white_msg = "\nYou ended the game.\n"
+        #Send different messages to each player
+        if game_ender == "BLACK":
+            black_msg = "\nYou ended the game.\n"
+            white_msg = "\nBLACK ended the game.\n"
+        else:  #WHITE
+            black_msg = "\nWHITE ended the game.\n"
+            white_msg = "\nYou ended the game.\n"
         
-    broadcast_to_clients(black_msg, white_msg)
-    print("i am here to intitiate")
-    #Generate and send game summary by email
-    server_bridge.on_game_end(f"Game ended by {game_ender}", None)
-    print("i am initiating email send")
+        broadcast_to_clients(black_msg, white_msg)
+        print("i am here to intitiate")
+        #Generate and send game summary by email
+        server_bridge.on_game_end(f"Game ended by {game_ender}", None)
+        print("i am initiating email send")
     
-    return draw_board_gui(board), f"Game ended by {game_ender}.", get_player_status(), get_ad_blocker_status()
+        return _ui_outputs(f"Game ended by {game_ender}.")
+
+def ai_move_gui():
+    """Have the search engine play one move for the side to move"""
+    with STATE_LOCK:
+        if game_state != GameState.PLAYING or board is None:
+            return _ui_outputs("No active game for the AI to move in.")
+        move = ai.best_move(board, depth=6)
+        if move is None:
+            return _ui_outputs("No legal moves available.")
+        start = board.coords_to_notation(*move[0])
+        end = board.coords_to_notation(*move[1])
+        #Route through the normal move path so broadcasts, email history and
+        #game-over handling all behave as if a player had typed the move
+        return move_piece_gui(start, end)
+
+#Last rendered (version, outputs) pair; reused verbatim on idle ticks
+_last_render = (None, None)
 
 def refresh_status():
     """Function to get updated game status and player information"""
-    status = update_game_status()
-    players = get_player_status()
-    ad_status = get_ad_blocker_status()
-    board_fig = draw_board_gui(board)
-    return board_fig, status, players, ad_status
+    global _last_render
+    with STATE_LOCK:
+        version = state_version
+    #The timer fires every couple of seconds whether or not anything
+    #happened; only an actual state transition pays for the figure redraw
+    #and status recomputation, idle ticks return the previous outputs
+    if _last_render[0] == version:
+        return _last_render[1]
+    _last_render = (version, _ui_outputs(update_game_status()))
+    return _last_render[1]
 
 #Client Handler
-def handle_client(client_socket, client_id):
-    """Handle communication with a client"""
-    global board, game_state, game_ender, new_game_requests, client_states
-    
-    player_color = "BLACK" if client_id == 0 else "WHITE"
-    client_states[client_id]["active"] = True
-    
-    try:
-        client_socket.sendall(f"Connected as {player_color}\n".encode('utf-8'))
-        
+def process_command(client_socket, client_id, player_color, data):
+    """Handle one command line from a client; False means disconnect"""
+    global board, game_state, game_ender, new_game_requests
+
+    with STATE_LOCK:
+        #Process "new game" requests
+        if data.lower() == "new game":
+            new_game_requests[client_id] = True
+            send_framed(client_socket, "New game requested. Waiting for other player...\n")
+            client_states[client_id]["waiting"] = True
+
+            #If both players requested a new game OR only one player connected, restart
+            if all(new_game_requests) or len(clients) == 1:
+                game_state = GameState.PLAYING
+                board = CheckersBoard()
+                new_game_requests = [False, False]  #Reset requests
+
+                #Reset waiting state for both clients
+                for i in range(len(client_states)):
+                    if client_states[i]["active"]:
+                        client_states[i]["waiting"] = False
+
+                #Reset game history for email summary
+                server_bridge.on_game_start()
+
+                board_str = board.board_to_string()
+                black_msg = f"\nNew game started!\n{board_str}\n\nYour turn, BLACK\n"
+                white_msg = f"\nNew game started!\n{board_str}\n\nBLACK's turn first\n"
+                broadcast_to_clients(black_msg, white_msg)
+
+        #Process email preferences
+        elif data.startswith("EMAIL:"):
+            handled, response = server_bridge.handle_email_preference(data, player_color)
+            if handled:
+                print(f"Player {player_color} email preference: {response}")
+
+        #Process quit command
+        elif data.lower() == "quit":
+            #Set who ended the game
+            if game_state == GameState.PLAYING:
+                game_state = GameState.OVER
+                game_ender = player_color
+
+                #Send game summary by email when player quits
+                server_bridge.on_game_end(f"Player {player_color} quit", None)
+
+            #Clear new game request for this player
+            new_game_requests[client_id] = False
+            other_id = 1 - client_id  #Get the other client's ID (0->1, 1->0)
+
+            #Check if other client is active
+            if client_states[other_id]["active"]:
+                opponent_msg = f"\nOpponent ({player_color}) quit. Game over.\n"
+                player_msg = f"\nYou've quit the game.\n"
+
+                if client_id == 0:  #BLACK player quit
+                    broadcast_to_clients(player_msg, opponent_msg)
+                else:  #WHITE player quit
+                    broadcast_to_clients(opponent_msg, player_msg)
+            return False
+
+        #Process moves from client during active game
+        elif game_state == GameState.PLAYING and " to " in data:
+            #The compiled pattern validates the notation in the same step
+            m = MOVE_RE.match(data)
+            if m is None:
+                send_framed(client_socket, "Invalid move. Try again.\n")
+                return True
+            try:
+                ok, status = _apply_move(m.group(1), m.group(2), player_color)
+            except Exception as e:
+                send_framed(client_socket, f"Error processing move: {str(e)}\n")
+                return True
+            if not ok:
+                send_framed(client_socket, status + "\n")
+            #On success the broadcasts from _apply_move already told both
+            #players everything
+
+        #Handle end game command from client
+        elif data.lower() == "end game" and game_state == GameState.PLAYING:
+            end_game(player_color)
+            #Send game summary by email
+            server_bridge.on_game_end(f"Game ended by {player_color}", None)
+
+        #Handle other commands
+        else:
+            #Only show help if the client is not in waiting state
+            if not client_states[client_id]["waiting"]:
+                send_framed(client_socket, "Unrecognized command. Valid commands are:\n- [position] to [position] (e.g. 'E2 to E4')\n- 'end game'\n- 'quit'\n- 'new game'\n")
+        return True
+
+def send_initial_state(client_socket, client_id, player_color):
+    """Greet a newly accepted player and start the game when both are in"""
+    global board, game_state, game_ender, new_game_requests
+
+    #The assignment is coalesced with the initial state below so the
+    #joining player gets a single frame instead of two back-to-back sends
+    greeting = f"Connected as {player_color}\n"
+
+    with STATE_LOCK:
         #Check if the game can start now when a second player joins
-        if len(clients) == 2 and (game_state == "waiting" or board is None):
+        if len(clients) == 2 and (game_state == GameState.WAITING or board is None):
             #Reset game completely
-            game_state = "playing"
+            game_state = GameState.PLAYING
             board = CheckersBoard()
             game_ender = None
             new_game_requests = [False, False]  #Reset requests
-            
+
             #Reset waiting state for both clients
             client_states[0]["waiting"] = False
             client_states[1]["waiting"] = False
 
             #Initialize game history for email summary
             server_bridge.on_game_start()
-            
+
             #Send different messages to each player
-            black_msg = f"\nGame started! Both players connected.\n{board.board_to_string()}\n\nYour turn, BLACK\n"
-            white_msg = f"\nGame started! Both players connected.\n{board.board_to_string()}\n\nBLACK's turn first\n"
+            board_str = board.board_to_string()
+            black_msg = f"\nGame started! Both players connected.\n{board_str}\n\nYour turn, BLACK\n"
+            white_msg = f"\nGame started! Both players connected.\n{board_str}\n\nBLACK's turn first\n"
+            if client_id == 0:
+                black_msg = greeting + black_msg
+            else:
+                white_msg = greeting + white_msg
             broadcast_to_clients(black_msg, white_msg)
         else:
             #Send initial game state to joining player
-            if board and game_state == "playing":
+            if board is not None and game_state == GameState.PLAYING:
                 #If rejoining during an active game, send current board state
                 board_str = board.board_to_string()
-                curr_player_color = "BLACK" if board.current_player == BLACK else "WHITE"
+                curr_player_color = COLOR_NAME[board.current_player]
                 if curr_player_color == player_color:
-                    client_socket.sendall(f"\nGame in progress.\n{board_str}\n\nYour turn, {player_color}\n".encode('utf-8'))
+                    send_framed(client_socket, f"{greeting}\nGame in progress.\n{board_str}\n\nYour turn, {player_color}\n")
                 else:
-                    client_socket.sendall(f"\nGame in progress.\n{board_str}\n\n{curr_player_color}'s turn now\n".encode('utf-8'))
+                    send_framed(client_socket, f"{greeting}\nGame in progress.\n{board_str}\n\n{curr_player_color}'s turn now\n")
             else:
-                client_socket.sendall("Waiting for another player...\n".encode('utf-8'))
+                send_framed(client_socket, f"{greeting}Waiting for another player...\n")
                 client_states[client_id]["waiting"] = True
-        
-        #Main client communication loop
-        while client_states[client_id]["active"]:
-            try:
-                data = client_socket.recv(1024).decode('utf-8')
-                if not data:
-                    print(f"Empty data received from {player_color}, disconnecting.")
-                    break
-                
-                #Process "new game" requests
-                if data.lower() == "new game":
-                    new_game_requests[client_id] = True
-                    client_socket.sendall("New game requested. Waiting for other player...\n".encode('utf-8'))
-                    client_states[client_id]["waiting"] = True
-                    
-                    #If both players requested a new game OR only one player connected, restart
-                    if all(new_game_requests) or len(clients) == 1:
-                        game_state = "playing"
-                        board = CheckersBoard()
-                        new_game_requests = [False, False]  #Reset requests
-                        
-                        #Reset waiting state for both clients
-                        for i in range(len(client_states)):
-                            if client_states[i]["active"]:
-                                client_states[i]["waiting"] = False
-                        
-                        #Reset game history for email summary
-                        server_bridge.on_game_start()
-                        
-                        board_str = board.board_to_string()
-                        black_msg = f"\nNew game started!\n{board_str}\n\nYour turn, BLACK\n"
-                        white_msg = f"\nNew game started!\n{board_str}\n\nBLACK's turn first\n"
-                        broadcast_to_clients(black_msg, white_msg)
-            
-                #Process email preferences
-                elif data.startswith("EMAIL:"):
-                    handled, response = server_bridge.handle_email_preference(data, player_color)
-                    if handled:
-                        print(f"Player {player_color} email preference: {response}")
-                        continue
-                
-                #Process quit command
-                elif data.lower() == "quit":
-                    #Set who ended the game
-                    if game_state == "playing":
-                        game_state = "over"
-                        game_ender = player_color
-
-                        #Send game summary by email when player quits
-                        server_bridge.on_game_end(f"Player {player_color} quit", None)
-                    
-                    #Clear new game request for this player
-                    new_game_requests[client_id] = False
-                    other_id = 1 - client_id  #Get the other client's ID (0->1, 1->0)
-                    
-                    #Check if other client is active
-                    if client_states[other_id]["active"]:
-                        opponent_msg = f"\nOpponent ({player_color}) quit. Game over.\n"
-                        player_msg = f"\nYou've quit the game.\n"
-                        
-                        if client_id == 0:  #BLACK player quit
-                            broadcast_to_clients(player_msg, opponent_msg)
-                        else:  #WHITE player quit
-                            broadcast_to_clients(opponent_msg, player_msg)
-                    break
-                
-                #Process moves from client during active game
-                elif game_state == "playing" and " to " in data:
-                    #Check if it's this player's turn
-                    curr_player_color = "BLACK" if board.current_player == BLACK else "WHITE"
-                    if curr_player_color != player_color:
-                        client_socket.sendall("Not your turn!\n".encode('utf-8'))
-                        continue
-                    
-                    #Parse the move
-                    parts = data.split(" to ")
-                    start, end = parts[0].strip(), parts[1].strip()
-                    
-                    try:
-                        sr, sc = notation_to_coords(start)
-                        er, ec = notation_to_coords(end)
-                        
-                        if not board.make_move((sr, sc), (er, ec)):
-                            client_socket.sendall("Invalid move. Try again.\n".encode('utf-8'))
-                            continue
-                        
-                        #Update GUI via queue
-                        board_str = board.board_to_string()
-                        move_msg = f"\nMove made: {start} to {end}\n{board_str}\n"
-
-                        #Record move for email summary
-                        server_bridge.record_move(player_color, start, end, board_str)
-                        
-                        #Check for game over
-                        if board.is_game_over():
-                            game_state = "over"
-                            winner = "BLACK" if board.get_winner() == BLACK else "WHITE"
-
-                            #Send game summary by email
-                            server_bridge.on_game_end("Game completed", winner)
-                            
-                            #Send different messages to each player
-                            black_msg = f"\nGame over! {'You win!' if winner == 'BLACK' else 'WHITE wins.'}\n{board_str}\n"
-                            white_msg = f"\nGame over! {'You win!' if winner == 'WHITE' else 'BLACK wins.'}\n{board_str}\n"
-                            broadcast_to_clients(black_msg, white_msg)
-                        else:
-                            next_player = "BLACK" if board.current_player == BLACK else "WHITE"
-                            
-                            #Send different messages to each player
-                            if next_player == "BLACK":
-                                black_msg = f"{move_msg}\nYour turn, BLACK\n"
-                                white_msg = f"{move_msg}\nBLACK is playing now\n"
-                            else:
-                                black_msg = f"{move_msg}\nWHITE is playing now\n"
-                                white_msg = f"{move_msg}\nYour turn, WHITE\n"
-                                
-                            broadcast_to_clients(black_msg, white_msg)
-                        
-                    except Exception as e:
-                        client_socket.sendall(f"Error processing move: {str(e)}\n".encode('utf-8'))
-                
-                #Handle end game command from client
-                elif data.lower() == "end game" and game_state == "playing":
-                    end_game(player_color)
-                    #Send game summary by email
-                    server_bridge.on_game_end(f"Game ended by {player_color}", None)
-                    
-                #Handle other commands
-                else:
-                    #Only show help if the client is not in waiting state
-                    if not client_states[client_id]["waiting"]:
-                        client_socket.sendall("Unrecognized command. Valid commands are:\n- [position] to [position] (e.g. 'E2 to E4')\n- 'end game'\n- 'quit'\n- 'new game'\n".encode('utf-8'))
-            
-            except ConnectionResetError:
-                print(f"Client {player_color} disconnected (connection reset).")
-                break
-            except Exception as e:
-                print(f"Error handling client {player_color}: {str(e)}")
-                traceback.print_exc()
-                break
-    
-    finally:
+
+def handle_disconnect(client_socket, client_id, player_color):
+    """Tear down a client slot and notify the remaining player"""
+    global board, game_state, game_ender, new_game_requests
+
+    with STATE_LOCK:
         #Handle client disconnect
         client_states[client_id]["active"] = False
         client_states[client_id]["waiting"] = False
+    
+        if clients.get(player_color) is client_socket:
+            clients.pop(player_color)
+            mark_state_dirty()  #Player panel shows the disconnect
         
-        if client_socket in clients:
-            client_idx = clients.index(client_socket)
-            clients.pop(client_idx)
-            
             try:
                 client_socket.close()
             except:
                 pass
-                
+            
             if len(clients) == 0:
                 #No players connected, reset everything
-                game_state = "waiting"
+                game_state = GameState.WAITING
                 game_ender = None
                 board = None
                 new_game_requests = [False, False]
-            elif game_state == "playing":
+            elif game_state == GameState.PLAYING:
                 #One player left during active game
-                game_state = "waiting"
+                game_state = GameState.WAITING
                 #Don't set board = None so the game state is preserved if player quickly reconnects
-                
+            
                 #Notify remaining player
-                for i, client in enumerate(clients):
+                for role, sock in clients.items():
                     try:
-                        client.sendall(f"\nPlayer {player_color} disconnected. Waiting for another player to join...\n".encode('utf-8'))
-                        client_states[i]["waiting"] = True
+                        send_framed(sock, f"\nPlayer {player_color} disconnected. Waiting for another player to join...\n")
+                        client_states[0 if role == "BLACK" else 1]["waiting"] = True
                     except:
                         pass
 
 #=== Server Socket Code ===
+def _accept_client(sel, server):
+    """Accept one connection, assign a role and register it with the loop"""
+    client, addr = server.accept()
+    print(f"Connection attempt from {addr}")
+    #Each turn is sent as one small sendall; disable Nagle so it goes
+    #out immediately instead of waiting on delayed ACKs, and let the
+    #kernel probe idle peers so a vanished client is detected even
+    #when the game is quiet
+    client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    client.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+    with STATE_LOCK:
+        accepted = len(clients) < 2
+        if accepted:
+            #Assign the free role; O(1) dict insert keyed by color
+            role = "BLACK" if "BLACK" not in clients else "WHITE"
+            client_id = 0 if role == "BLACK" else 1
+            clients[role] = client
+            client_states[client_id]["active"] = True
+            mark_state_dirty()  #Player panel shows the new connection
+    if accepted:
+        print(f"Player {role} ({addr}) connected")
+        #Per-client context carried by the selector: role, a line buffer
+        #that reassembles newline-terminated commands across reads, and a
+        #preallocated receive buffer reused by recv_into
+        sel.register(client, selectors.EVENT_READ,
+                     {"id": client_id, "role": role,
+                      "buf": bytearray(), "rx": memoryview(bytearray(4096))})
+        send_initial_state(client, client_id, role)
+    else:
+        #Reject connection if we already have 2 players
+        print(f"Rejecting connection from {addr}: server full")
+        try:
+            send_framed(client, "SERVER FULL: Only two players allowed. Please try again later.\n")
+            client.close()
+        except:
+            pass
+
+def _service_client(sel, client_socket, ctx):
+    """Read what arrived on one client socket and dispatch complete lines"""
+    client_id = ctx["id"]
+    player_color = ctx["role"]
+    disconnect = False
+    try:
+        nbytes = client_socket.recv_into(ctx["rx"])
+        if not nbytes:
+            print(f"Empty data received from {player_color}, disconnecting.")
+            disconnect = True
+        else:
+            #Commands are newline-terminated; bytes are buffered until a
+            #full line is available so TCP segmentation can neither split
+            #nor merge commands, and one read can service several commands
+            pending = ctx["buf"]
+            pending += ctx["rx"][:nbytes]
+            while (nl := pending.find(b"\n")) != -1:
+                data = str(pending[:nl], 'utf-8').strip()
+                del pending[:nl + 1]
+                if data and not process_command(client_socket, client_id, player_color, data):
+                    disconnect = True
+                    break
+    except ConnectionResetError:
+        print(f"Client {player_color} disconnected (connection reset).")
+        disconnect = True
+    except Exception as e:
+        print(f"Error handling client {player_color}: {str(e)}")
+        traceback.print_exc()
+        disconnect = True
+
+    #broadcast_to_clients marks a client inactive when a send fails; the
+    #loop notices that here on the client's next readiness event
+    if disconnect or not client_states[client_id]["active"]:
+        sel.unregister(client_socket)
+        handle_disconnect(client_socket, client_id, player_color)
+
 def socket_thread():
-    """Thread to handle incoming socket connections"""
+    """Serve the listener and both player sockets from one event loop"""
     global board, game_state, clients, client_states
-    
+
     server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    
+
+    #One selector multiplexes the listening socket and both clients, so a
+    #single thread replaces the old thread-per-client handlers: no stack
+    #per player, no GIL hand-offs between receive loops, and command
+    #processing is serialized by construction. Sockets stay blocking --
+    #the selector only gates reads, and writes are small sendall calls
+    #that never fill the send buffer at two players
+    sel = selectors.DefaultSelector()
+
     try:
         server.bind(('127.0.0.1', 65244))
         server.listen(2)
         print("Server listening on 127.0.0.1:65244")
-        
+        sel.register(server, selectors.EVENT_READ, None)
+
         while True:
-            #Always accept the connection
-            client, addr = server.accept()
-            print(f"Connection attempt from {addr}")
-            
-            if len(clients) < 2:
-                #Add client to our list - assign the first free slot (0 or 1)
-                client_id = 0 if not client_states[0]["active"] else 1
-                clients.append(client)
-                print(f"Player {client_id} ({addr}) connected")
-                
-                #Start a thread to handle this client
-                threading.Thread(target=handle_client, args=(client, client_id), daemon=True).start()
-            else:
-                #Reject connection if we already have 2 players
-                print(f"Rejecting connection from {addr}: server full")
-                try:
-                    client.sendall("SERVER FULL: Only two players allowed. Please try again later.\n".encode('utf-8'))
-                    client.close()
-                except:
-                    pass
-    
+            for key, _ in sel.select(timeout=1):
+                if key.data is None:
+                    _accept_client(sel, server)
+                else:
+                    _service_client(sel, key.fileobj, key.data)
+
     except Exception as e:
         print(f"Server error: {str(e)}")
     finally:
+        sel.close()
         server.close()
 
-#UI Refresh Thread
-def ui_refresh_thread(refresh_btn):
-    """Thread to periodically trigger UI refresh"""
-    while True:
-        time.sleep(2)  #Refresh every 2 seconds
-        try:
-            #Use the refresh button's click method to trigger an update
-            #This is a workaround since we can't directly update UI components from a thread
-            refresh_btn.click()
-        except:
-            pass
-
 #Launch Everything
-game_state = "waiting"
+game_state = GameState.WAITING
 game_ender = None  #Initialize game_ender
 
 #Initialize ad blocker
 BLOCKLIST_FILE = "blocklist.txt"
 ALLOWLIST_FILE = "allowlist.txt"
 
-#Create empty blocklist if needed
-if not os.path.exists(BLOCKLIST_FILE):
-    with open(BLOCKLIST_FILE, 'w') as f:
-        f.write("#Blocklist - Domains listed here will be blocked\n")
-        f.write("#Add one domain per line\n")
-        f.write("0.0.0.0 doubleclick.net\n")
-        f.write("0.0.0.0 googleadservices.com\n")
-
-#Create empty allowlist if needed
-if not os.path.exists(ALLOWLIST_FILE):
-    with open(ALLOWLIST_FILE, 'w') as f:
-        f.write("#Allowlist - Domains listed here will never be blocked\n")
-        f.write("#Add one domain per line\n")
-        f.write("google.com\n")
-        f.write("youtube.com\n")
+#Seed content for first run, prebuilt so each file is one write
+DEFAULT_BLOCKLIST = (
+    b"#Blocklist - Domains listed here will be blocked\n"
+    b"#Add one domain per line\n"
+    b"0.0.0.0 doubleclick.net\n"
+    b"0.0.0.0 googleadservices.com\n"
+)
+DEFAULT_ALLOWLIST = (
+    b"#Allowlist - Domains listed here will never be blocked\n"
+    b"#Add one domain per line\n"
+    b"google.com\n"
+    b"youtube.com\n"
+)
+
+#'xb' folds the existence check into the open, so creation is atomic and
+#there is no window between the check and the write
+for _seed_path, _seed_content in ((BLOCKLIST_FILE, DEFAULT_BLOCKLIST),
+                                  (ALLOWLIST_FILE, DEFAULT_ALLOWLIST)):
+    try:
+        with open(_seed_path, 'xb') as f:
+            f.write(_seed_content)
+    except FileExistsError:
+        pass
 
 #Initialize DNS resolver
 ad_blocker = BlocklistResolver(UPSTREAM_DNS, BLOCKLIST_FILE, ALLOWLIST_FILE)
 
+#Prefetch the allowlisted names into the answer cache in the background;
+#they are the names most likely to be asked for first
+threading.Thread(target=ad_blocker._warm_cache, daemon=True).start()
+
 #Start DNS server in background
-dns_server = DNSServer(ad_blocker, port=12553, address="127.0.0.1")
+dns_server = WorkerPoolDNSServer(ad_blocker, address="127.0.0.1", port=12553)
 dns_thread = threading.Thread(target=dns_server.start, daemon=True)
 dns_thread.start()
 
+#Static sidebar content rendered once; never an output target, so Gradio
+#events don't re-diff it
+RULES_HTML = """
+<h3>Rules</h3>
+<ul>
+<li>BLACK moves first</li>
+<li>Regular checkers can only move diagonally forward</li>
+<li>Kings can move diagonally in any direction</li>
+<li>Captures are mandatory</li>
+<li>Multiple captures in one turn are allowed</li>
+</ul>
+"""
+
 with gr.Blocks() as demo:
     gr.Markdown("### Checkers Game with Ad Blocker")
     
@@ -896,6 +1566,7 @@ with gr.Blocks() as demo:
             
             with gr.Row():
                 move_btn = gr.Button("Make Move")
+                ai_move_btn = gr.Button("AI Move")
                 restart_btn = gr.Button("Restart Game")
                 end_game_btn = gr.Button("End Game")
         
@@ -907,40 +1578,32 @@ with gr.Blocks() as demo:
             ad_blocker_info = gr.Textbox(label="Domain Status", interactive=False, value="Initializing...")
             domain_refresh_btn = gr.Button("Refresh Domain")
             
-            gr.Markdown("### Rules")
-            gr.Markdown("""
-            - BLACK moves first
-            - Regular checkers can only move diagonally forward
-            - Kings can move diagonally in any direction
-            - Captures are mandatory
-            - Multiple captures in one turn are allowed
-            """)
+            gr.HTML(RULES_HTML)
     
     #Set up event handlers
     move_btn.click(fn=move_piece_gui, inputs=[start_input, end_input], outputs=[board_output, status_output, players_info, ad_blocker_info])
+    ai_move_btn.click(fn=ai_move_gui, outputs=[board_output, status_output, players_info, ad_blocker_info])
     restart_btn.click(fn=restart_game, outputs=[board_output, status_output, players_info, ad_blocker_info])
     domain_refresh_btn.click(fn=refresh_domain, outputs=[ad_blocker_info])
     
-    #For the End Game button, we'll use the current player
+    #end_game resolves the current player itself under STATE_LOCK; the old
+    #lambda read board.current_player on the Gradio thread with no lock
     end_game_btn.click(
-        fn=lambda: end_game(
-            "BLACK" if board and board.current_player == BLACK else "WHITE"
-        ), 
+        fn=end_game,
         outputs=[board_output, status_output, players_info, ad_blocker_info]
     )
     
-    #Set up refresh mechanism
-    refresh_btn = gr.Button("Refresh", visible=False)
-    refresh_btn.click(fn=refresh_status, outputs=[board_output, status_output, players_info, ad_blocker_info])
+    #Set up refresh mechanism: a Gradio timer drives periodic refreshes
+    #instead of a background thread clicking a hidden button
+    refresh_timer = gr.Timer(2.0)
+    refresh_timer.tick(fn=refresh_status, outputs=[board_output, status_output, players_info, ad_blocker_info])
     
-    #Initialize the board
-    demo.load(lambda: (draw_board_gui(CheckersBoard()), update_game_status(), get_player_status(), get_ad_blocker_status()), 
+    #Initialize the board; refresh_status already renders the live board or
+    #the shared starting position when no game exists
+    demo.load(fn=refresh_status,
              outputs=[board_output, status_output, players_info, ad_blocker_info])
     
     #Start server socket in background thread
     threading.Thread(target=socket_thread, daemon=True).start()
-    
-    #Start UI refresh thread
-    threading.Thread(target=ui_refresh_thread, args=(refresh_btn,), daemon=True).start()
 
 demo.launch(share=True)